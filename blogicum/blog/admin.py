@@ -1,22 +1,95 @@
+from django import forms
 from django.contrib import admin
+from django.contrib.admin.widgets import AutocompleteSelect
+from django.db.models.functions import Substr
+from django.forms.models import BaseInlineFormSet
+from django.utils.functional import cached_property
+from django.utils.text import Truncator
 
-from .models import Category, Comments, Location, Post
+from .admin_filters import AutocompleteFilter
+from .forms import ImageLimitFormMixin
+from .models import Category, Comments, Location, Post, ThrottledRequest
+from .paginators import EstimatedCountPaginator
+
+# Сколько символов текста поста показывать в списке постов
+TEXT_PREVIEW_LENGTH = 50
+# Сколько постов показывать на странице категории и локации
+POST_INLINE_LIMIT = 20
+
+
+class PostInlineFormSet(BaseInlineFormSet):
+    """Формсет, который загружает только первые посты"""
+
+    def get_queryset(self):
+        if not hasattr(self, '_queryset'):
+            self._queryset = super().get_queryset()[:POST_INLINE_LIMIT]
+        return self._queryset
+
+    @cached_property
+    def total_count(self):
+        return self.queryset.count()
+
+    @cached_property
+    def changelist_query(self):
+        # Параметр совпадает с фильтрами в списке постов
+        return f'{self.fk.name}__id__exact={self.instance.pk}'
 
 
 class PostInline(admin.TabularInline):
-    """Добавление информации о постах в информации о категории"""
+    """Добавление информации о постах в информации о категории.
+
+    Показываем только последние публикации и только для чтения,
+    полный список открывается в отфильтрованном списке постов.
+    """
 
     model = Post
+    formset = PostInlineFormSet
+    template = 'admin/blog/post_inline.html'
+    fields = ('title', 'author', 'pub_date', 'is_published')
+    show_change_link = True
     extra = 0
 
+    def get_queryset(self, request):
+        return super().get_queryset(request).select_related('author')
+
+    def has_add_permission(self, request, obj=None):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def has_delete_permission(self, request, obj=None):
+        return False
+
+
+class AuthorFilter(AutocompleteFilter):
+    title = 'автор'
+    field_name = 'author'
+
+
+class CategoryFilter(AutocompleteFilter):
+    title = 'категория'
+    field_name = 'category'
+
+
+class LocationFilter(AutocompleteFilter):
+    title = 'местоположение'
+    field_name = 'location'
+
+
+class PostAdminForm(ImageLimitFormMixin, forms.ModelForm):
+    """Форма поста в админке с проверкой размеров картинки"""
+
 
 class PostAdmin(admin.ModelAdmin):
     """Настройка вывода информации о постах"""
 
+    form = PostAdminForm
+
     list_display = (
         'id',
         'title',
-        'text',
+        'text_preview',
         'pub_date',
         'author',
         'location',
@@ -28,11 +101,52 @@ class PostAdmin(admin.ModelAdmin):
         'is_published',
         'category',
         'location',
-        'text'
     )
+    # Авторы, категории и локации подгружаются одним запросом со списком
+    list_select_related = ('author', 'location', 'category')
+    # Вместо выпадающих списков со всеми объектами – поиск по мере ввода
+    autocomplete_fields = ('author', 'category', 'location')
     search_fields = ('title',)
-    list_filter = ('category', 'author', 'location', 'category')
+    list_filter = (
+        AuthorFilter,
+        CategoryFilter,
+        LocationFilter,
+        'is_published',
+    )
     list_display_links = ('title',)
+    # Не считаем все посты повторно при каждом применении фильтра
+    show_full_result_count = False
+    paginator = EstimatedCountPaginator
+
+    @property
+    def media(self):
+        # Фильтрам нужны скрипты select2, даже если на странице нет формы
+        autocomplete_widget = AutocompleteSelect(
+            Post._meta.get_field('author'), self.admin_site
+        )
+        return (
+            super().media
+            + autocomplete_widget.media
+            + forms.Media(js=('js/admin_autocomplete_filter.js',))
+        )
+
+    def get_form(self, request, obj=None, **kwargs):
+        form = super().get_form(request, obj, **kwargs)
+        # Админка создаёт форму сама, поэтому ошибки приёма файла
+        # передаём через атрибут класса
+        return type(form.__name__, (form,), {
+            'upload_errors': getattr(request, 'upload_errors', {}),
+        })
+
+    def get_queryset(self, request):
+        # Не тянем полный текст поста ради превью в списке
+        return super().get_queryset(request).annotate(
+            text_start=Substr('text', 1, TEXT_PREVIEW_LENGTH + 1),
+        ).defer('text')
+
+    @admin.display(description='Текст')
+    def text_preview(self, obj):
+        return Truncator(obj.text_start).chars(TEXT_PREVIEW_LENGTH)
 
 
 class CategoryAdmin(admin.ModelAdmin):
@@ -54,6 +168,7 @@ class CategoryAdmin(admin.ModelAdmin):
     )
     list_filter = ('is_published',)
     list_display_links = ('title',)
+    search_fields = ('title',)
 
 
 class LocationAdmin(admin.ModelAdmin):
@@ -72,6 +187,7 @@ class LocationAdmin(admin.ModelAdmin):
     )
     list_filter = ('is_published',)
     list_display_links = ('name',)
+    search_fields = ('name',)
 
 
 class CommentsAdmin(admin.ModelAdmin):
@@ -84,10 +200,28 @@ class CommentsAdmin(admin.ModelAdmin):
         'post',
         'author',
     )
+    list_select_related = ('post', 'author')
+    # Поля для ввода id вместо списков со всеми постами и пользователями
+    raw_id_fields = ('post', 'author')
     list_display_links = ('id',)
 
 
+class ThrottledRequestAdmin(admin.ModelAdmin):
+    """Счётчики отклонённых ограничением частоты запросов"""
+
+    list_display = ('scope', 'key', 'count', 'last_at')
+    list_filter = ('scope',)
+    search_fields = ('key',)
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+
 admin.site.register(Category, CategoryAdmin)
 admin.site.register(Location, LocationAdmin)
 admin.site.register(Post, PostAdmin)
 admin.site.register(Comments, CommentsAdmin)
+admin.site.register(ThrottledRequest, ThrottledRequestAdmin)
@@ -0,0 +1,46 @@
+"""Фильтры для админки"""
+
+from django import forms
+from django.contrib import admin
+from django.contrib.admin.widgets import AutocompleteSelect
+
+
+class AutocompleteFilter(admin.SimpleListFilter):
+    """Фильтр по внешнему ключу с подгрузкой вариантов через autocomplete.
+
+    В отличие от стандартного RelatedFieldListFilter не загружает
+    все связанные объекты в боковую панель: варианты подгружаются
+    по мере ввода из autocomplete-вьюхи админки.
+    """
+
+    template = 'admin/blog/autocomplete_filter.html'
+    field_name = None
+
+    def __init__(self, request, params, model, model_admin):
+        self.parameter_name = f'{self.field_name}__id__exact'
+        super().__init__(request, params, model, model_admin)
+        field = model._meta.get_field(self.field_name)
+        if self.title is None:
+            self.title = field.verbose_name
+        self.widget = AutocompleteSelect(field, model_admin.admin_site)
+        form_field = forms.ModelChoiceField(
+            queryset=field.remote_field.model._default_manager.all(),
+            widget=self.widget,
+            required=False,
+        )
+        self.rendered_widget = form_field.widget.render(
+            name=self.parameter_name,
+            value=self.value(),
+            attrs={'id': f'id_filter_{self.field_name}'},
+        )
+
+    def has_output(self):
+        return True
+
+    def lookups(self, request, model_admin):
+        return ()
+
+    def queryset(self, request, queryset):
+        if self.value():
+            return queryset.filter(**{self.parameter_name: self.value()})
+        return queryset
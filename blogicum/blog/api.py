@@ -0,0 +1,201 @@
+"""JSON API только для чтения.
+
+Обычные Django-вьюхи поверх get_model_queryset. Данные выбираются
+через .values(), без создания объектов моделей, страницы отдаются
+по ключу (параметр after), набор полей задаётся параметром fields.
+"""
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.exceptions import BadRequest
+from django.http import JsonResponse
+from django.shortcuts import get_object_or_404
+from django.utils.http import urlencode
+from django.views import View
+
+from blog.models import Category, Comments, Post
+from .query_utils import get_model_queryset, get_visible_posts, keyset_paginate
+
+User = get_user_model()
+
+# Размер страницы по умолчанию и максимальный размер страницы
+API_PAGINATE_BY = getattr(settings, 'PAGINATE_BY', 10)
+API_MAX_LIMIT = 100
+
+# Имя поля в API -> путь в ORM
+POST_FIELDS = {
+    'id': 'id',
+    'title': 'title',
+    'text': 'text',
+    'pub_date': 'pub_date',
+    'author': 'author__username',
+    'category': 'category__slug',
+    'location': 'location__name',
+    'image': 'image',
+    'image_width': 'image_meta__width',
+    'image_height': 'image_meta__height',
+    'comment_count': 'comment_count',
+}
+COMMENT_FIELDS = {
+    'id': 'id',
+    'text': 'text',
+    'created_at': 'created_at',
+    'author': 'author__username',
+}
+
+
+class BaseApiView(View):
+    """Базовая вьюха API: выбор полей, сериализация словарей"""
+
+    fields_map = None
+
+    def get_fields(self):
+        """Поля из параметра fields, по умолчанию все"""
+        fields = self.request.GET.get('fields')
+        if not fields:
+            return list(self.fields_map)
+        fields = [name.strip() for name in fields.split(',') if name.strip()]
+        unknown = set(fields) - set(self.fields_map)
+        if unknown:
+            raise BadRequest(
+                f'Неизвестные поля: {", ".join(sorted(unknown))}'
+            )
+        return fields
+
+    def get_values(self, fields):
+        """Поля для .values(), включая нужные для пагинации"""
+        return {'id', *(self.fields_map[name] for name in fields)}
+
+    def serialize(self, row, fields):
+        return {name: row[self.fields_map[name]] for name in fields}
+
+
+class BaseApiListView(BaseApiView):
+    """Список объектов с пагинацией по ключу.
+
+    Наследники задают ordering и get_queryset(fields) – выборку
+    объектов, из которой берутся запрошенные поля fields.
+    """
+
+    ordering = None
+
+    def get_limit(self):
+        try:
+            limit = int(self.request.GET.get('limit', API_PAGINATE_BY))
+        except ValueError:
+            raise BadRequest('Параметр limit должен быть числом')
+        return max(1, min(limit, API_MAX_LIMIT))
+
+    def get_next_url(self, cursor):
+        if cursor is None:
+            return None
+        params = self.request.GET.copy()
+        params['after'] = cursor
+        return f'{self.request.path}?{urlencode(params)}'
+
+    def get(self, request, *args, **kwargs):
+        fields = self.get_fields()
+        queryset = self.get_queryset(fields).values(*self.get_values(fields))
+        try:
+            rows, next_cursor = keyset_paginate(
+                queryset,
+                ordering=self.ordering,
+                cursor=request.GET.get('after'),
+                limit=self.get_limit(),
+            )
+        except ValueError:
+            raise BadRequest('Некорректный параметр after')
+        return JsonResponse({
+            'results': [self.serialize(row, fields) for row in rows],
+            'next': self.get_next_url(next_cursor),
+        })
+
+
+class PostApiMixin:
+    """Поля и сериализация постов"""
+
+    fields_map = POST_FIELDS
+    ordering = ('-pub_date', '-id')
+
+    def get_values(self, fields):
+        values = super().get_values(fields) | {'pub_date'}
+        if 'location' in fields:
+            # Неопубликованные локации не показываем, как и на страницах
+            values.add('location__is_published')
+        return values
+
+    def serialize(self, row, fields):
+        data = super().serialize(row, fields)
+        if 'location' in data and not row['location__is_published']:
+            data['location'] = None
+        if data.get('image'):
+            data['image'] = Post.image.field.storage.url(data['image'])
+        elif 'image' in data:
+            data['image'] = None
+        return data
+
+
+class PostListApiView(PostApiMixin, BaseApiListView):
+    """Лента опубликованных постов"""
+
+    def get_queryset(self, fields):
+        return get_model_queryset(
+            add_annotation='comment_count' in fields,
+        )
+
+
+class CategoryPostsApiView(PostApiMixin, BaseApiListView):
+    """Лента постов категории"""
+
+    def get_queryset(self, fields):
+        category = get_object_or_404(
+            Category,
+            slug=self.kwargs['category_slug'],
+            is_published=True,
+        )
+        return get_model_queryset(
+            model_manager=category.posts,
+            add_annotation='comment_count' in fields,
+        )
+
+
+class ProfilePostsApiView(PostApiMixin, BaseApiListView):
+    """Лента постов пользователя, автору видны все его посты"""
+
+    def get_queryset(self, fields):
+        author = get_object_or_404(User, username=self.kwargs['username'])
+        return get_model_queryset(
+            model_manager=author.posts,
+            add_filters=self.request.user != author,
+            add_annotation='comment_count' in fields,
+        )
+
+
+class PostDetailApiView(PostApiMixin, BaseApiView):
+    """Один пост"""
+
+    def get(self, request, *args, **kwargs):
+        fields = self.get_fields()
+        queryset = get_visible_posts(
+            request.user,
+            add_annotation='comment_count' in fields,
+        ).values(*self.get_values(fields))
+        row = get_object_or_404(queryset, pk=self.kwargs['post_id'])
+        return JsonResponse(self.serialize(row, fields))
+
+
+class CommentListApiView(BaseApiListView):
+    """Комментарии к посту"""
+
+    fields_map = COMMENT_FIELDS
+    ordering = ('created_at', 'id')
+
+    def get_values(self, fields):
+        return super().get_values(fields) | {'created_at'}
+
+    def get_queryset(self, fields):
+        post = get_object_or_404(
+            get_visible_posts(self.request.user).values('id'),
+            pk=self.kwargs['post_id'],
+        )
+        return Comments.objects.filter(post_id=post['id'])
@@ -0,0 +1,160 @@
+"""Асинхронные версии ленты, поста, категории и профиля.
+
+Django 3.2 не умеет асинхронные class-based views и асинхронный ORM,
+поэтому это функции, а запросы к базе выполняются в пуле потоков.
+Независимые запросы (объект страницы, число постов, сами посты,
+комментарии) запускаются одновременно через asyncio.gather.
+"""
+
+import asyncio
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.paginator import InvalidPage, Page, Paginator
+from django.db import connection
+from django.http import Http404
+from django.shortcuts import render
+
+from blog.models import Category, Post
+from .forms import CommentForm
+from .query_utils import get_model_queryset, is_post_visible
+from .views import get_comments_page
+
+paginate_by = getattr(settings, 'PAGINATE_BY', 10)
+User = get_user_model()
+
+
+def _run_and_close(func, *args):
+    try:
+        return func(*args)
+    finally:
+        # Соединение принадлежит потоку из пула, не держим его открытым
+        connection.close()
+
+
+async def run_query(func, *args):
+    """Выполняем запрос к базе в отдельном потоке"""
+    return await sync_to_async(_run_and_close, thread_sensitive=False)(
+        func, *args
+    )
+
+
+async def resolve_user(request):
+    """Загружаем request.user, не блокируя цикл событий"""
+    await sync_to_async(lambda: request.user.is_authenticated)()
+    return request.user
+
+
+def get_first(queryset):
+    return queryset.first()
+
+
+async def get_page(request, queryset):
+    """Страница постов: подсчёт и выборка идут одновременно"""
+    try:
+        number = int(request.GET.get('page') or 1)
+    except ValueError:
+        raise Http404
+    offset = (max(number, 1) - 1) * paginate_by
+    count, posts = await asyncio.gather(
+        run_query(queryset.count),
+        run_query(list, queryset[offset:offset + paginate_by]),
+    )
+    paginator = Paginator(queryset, paginate_by)
+    # Число объектов уже посчитано, повторный COUNT не нужен
+    paginator.count = count
+    try:
+        number = paginator.validate_number(number)
+    except InvalidPage:
+        raise Http404
+    return Page(posts, number, paginator)
+
+
+async def render_async(request, template_name, context):
+    # Рендер шаблона может обращаться к сессии и базе
+    return await sync_to_async(render)(request, template_name, context)
+
+
+def get_list_context(page):
+    return {
+        'page_obj': page,
+        'paginator': page.paginator,
+        'is_paginated': page.has_other_pages(),
+        'post_list': page.object_list,
+        'object_list': page.object_list,
+    }
+
+
+async def post_list(request):
+    """Лента постов"""
+    page = await get_page(
+        request, get_model_queryset(add_filters=True, add_annotation=True)
+    )
+    return await render_async(
+        request, 'blog/post_list.html', get_list_context(page)
+    )
+
+
+async def category_posts(request, category_slug):
+    """Посты категории"""
+    category_queryset = Category.objects.filter(
+        slug=category_slug, is_published=True
+    )
+    posts = get_model_queryset(
+        model_manager=Post.objects.filter(category__slug=category_slug),
+        add_annotation=True,
+    )
+    category, page = await asyncio.gather(
+        run_query(get_first, category_queryset),
+        get_page(request, posts),
+    )
+    if category is None:
+        raise Http404
+    context = get_list_context(page)
+    context['category'] = category
+    return await render_async(request, 'blog/category_list.html', context)
+
+
+async def profile(request, username):
+    """Профиль пользователя и его посты"""
+    user = await resolve_user(request)
+    # Автору показываем все его посты, остальным – только опубликованные
+    posts = get_model_queryset(
+        model_manager=Post.objects.filter(author__username=username),
+        add_filters=user.get_username() != username,
+        add_annotation=True,
+    )
+    author, page = await asyncio.gather(
+        run_query(get_first, User.objects.filter(username=username)),
+        get_page(request, posts),
+    )
+    if author is None:
+        raise Http404
+    context = get_list_context(page)
+    context['profile'] = author
+    return await render_async(request, 'blog/profile.html', context)
+
+
+async def post_detail(request, post_id):
+    """Пост с первой страницей комментариев"""
+    post_queryset = Post.objects.select_related(
+        'category', 'location', 'author'
+    ).filter(pk=post_id)
+    stub = Post(pk=post_id)
+    user = await resolve_user(request)
+    post, (comments, next_cursor), comment_count = await asyncio.gather(
+        run_query(get_first, post_queryset),
+        run_query(get_comments_page, stub),
+        run_query(stub.comments.count),
+    )
+    if post is None or not is_post_visible(post, user):
+        raise Http404
+    return await render_async(request, 'blog/post_detail.html', {
+        'post': post,
+        'object': post,
+        'form': CommentForm(),
+        'comments': comments,
+        'comments_next_cursor': next_cursor,
+        'comment_count': comment_count,
+    })
@@ -0,0 +1,148 @@
+"""Резервные копии базы SQLite через online backup API"""
+
+import gzip
+import os
+import shutil
+import sqlite3
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+
+# Сколько страниц копировать за один шаг backup API
+BACKUP_PAGES_PER_STEP = 1024
+# Пауза между шагами, чтобы не держать блокировку базы
+BACKUP_STEP_PAUSE = 0.005
+SNAPSHOT_PREFIX = 'db-'
+SNAPSHOT_SUFFIXES = ('.sqlite3', '.sqlite3.gz')
+
+
+class BackupError(Exception):
+    """Ошибка создания или восстановления копии"""
+
+
+def make_snapshot(
+        source_path, target_path, pages=BACKUP_PAGES_PER_STEP,
+        pause=BACKUP_STEP_PAUSE):
+    """Согласованная копия базы, снимаемая частями без остановки сайта.
+
+    Между шагами база доступна на запись другим соединениям.
+    Возвращает число скопированных страниц.
+    """
+    copied = {'pages': 0}
+
+    def progress(status, remaining, total):
+        copied['pages'] = total - remaining
+        if remaining:
+            time.sleep(pause)
+
+    source = sqlite3.connect(f'file:{source_path}?mode=ro', uri=True)
+    try:
+        target = sqlite3.connect(target_path)
+        try:
+            source.backup(target, pages=pages, progress=progress)
+        finally:
+            target.close()
+    finally:
+        source.close()
+    return copied['pages']
+
+
+def check_integrity(path):
+    """PRAGMA integrity_check для файла базы"""
+    try:
+        connection = sqlite3.connect(f'file:{path}?mode=ro', uri=True)
+        try:
+            result = connection.execute('PRAGMA integrity_check').fetchall()
+        finally:
+            connection.close()
+    except sqlite3.DatabaseError as error:
+        raise BackupError(f'{path} не является базой SQLite: {error}')
+    if result != [('ok',)]:
+        problems = '; '.join(row[0] for row in result[:10])
+        raise BackupError(f'Копия {path} повреждена: {problems}')
+
+
+def compress_file(path):
+    """Сжимаем файл в .gz рядом с ним и удаляем исходный"""
+    compressed = Path(f'{path}.gz')
+    with open(path, 'rb') as source, gzip.open(compressed, 'wb') as target:
+        shutil.copyfileobj(source, target)
+    os.remove(path)
+    return compressed
+
+
+def create_backup(
+        source_path, backup_dir, compress=False,
+        pages=BACKUP_PAGES_PER_STEP, pause=BACKUP_STEP_PAUSE):
+    """Снимок базы в backup_dir, возвращает путь и статистику"""
+    backup_dir = Path(backup_dir)
+    backup_dir.mkdir(parents=True, exist_ok=True)
+    stamp = datetime.now().strftime('%Y%m%d-%H%M%S-%f')
+    final_path = backup_dir / f'{SNAPSHOT_PREFIX}{stamp}.sqlite3'
+    # Пишем во временный файл, чтобы в каталоге не было недописанных копий
+    partial_path = backup_dir / f'.{final_path.name}.part'
+    started = time.monotonic()
+    try:
+        copied_pages = make_snapshot(
+            source_path, partial_path, pages=pages, pause=pause
+        )
+        check_integrity(partial_path)
+        if compress:
+            partial_path = compress_file(partial_path)
+            final_path = Path(f'{final_path}.gz')
+        os.replace(partial_path, final_path)
+    except (sqlite3.Error, OSError) as error:
+        raise BackupError(f'Не удалось создать копию: {error}')
+    finally:
+        for leftover in backup_dir.glob(f'.{SNAPSHOT_PREFIX}*.part*'):
+            leftover.unlink()
+    return final_path, {
+        'pages': copied_pages,
+        'bytes': os.path.getsize(source_path),
+        'seconds': time.monotonic() - started,
+    }
+
+
+def list_snapshots(backup_dir):
+    """Копии в каталоге, от старых к новым"""
+    return sorted(
+        path for path in Path(backup_dir).glob(f'{SNAPSHOT_PREFIX}*')
+        if path.name.endswith(SNAPSHOT_SUFFIXES)
+    )
+
+
+def rotate_snapshots(backup_dir, keep):
+    """Удаляем старые копии, оставляя keep последних"""
+    snapshots = list_snapshots(backup_dir)
+    removed = snapshots[:-keep] if keep else []
+    for path in removed:
+        path.unlink()
+    return removed
+
+
+def restore_backup(snapshot_path, target_path):
+    """Заменяем базу копией после проверки её целостности.
+
+    Копия распаковывается рядом с базой, проверяется и атомарно
+    подменяет файл базы. Прежняя база сохраняется с суффиксом .old.
+    """
+    snapshot_path = Path(snapshot_path)
+    target_path = Path(target_path)
+    descriptor, temp_name = tempfile.mkstemp(
+        dir=target_path.parent, prefix=f'.{target_path.name}.', suffix='.tmp'
+    )
+    try:
+        opener = gzip.open if snapshot_path.suffix == '.gz' else open
+        with os.fdopen(descriptor, 'wb') as target, \
+                opener(snapshot_path, 'rb') as source:
+            shutil.copyfileobj(source, target)
+        check_integrity(temp_name)
+        if target_path.exists():
+            shutil.copy2(target_path, f'{target_path}.old')
+        os.replace(temp_name, target_path)
+    except OSError as error:
+        raise BackupError(f'Не удалось восстановить копию: {error}')
+    finally:
+        if os.path.exists(temp_name):
+            os.remove(temp_name)
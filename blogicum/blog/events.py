@@ -0,0 +1,97 @@
+"""Публикация событий о новых комментариях для SSE.
+
+Бэкенд задаётся настройкой BLOG_EVENTS_BACKEND (путь к классу).
+По умолчанию – InProcessBackend, который работает в пределах одного
+процесса; для нескольких процессов нужен бэкенд поверх внешнего
+брокера с тем же интерфейсом: subscribe(channel) и publish(channel, data).
+"""
+
+import queue
+import threading
+from functools import lru_cache
+
+from django.conf import settings
+from django.utils.module_loading import import_string
+
+DEFAULT_EVENTS_BACKEND = 'blog.events.InProcessBackend'
+# Сколько непрочитанных событий держим для одного подписчика
+SUBSCRIPTION_QUEUE_SIZE = 100
+
+
+class Subscription:
+    """Подписка на канал, читается через get()"""
+
+    def __init__(self, backend, channel):
+        self.backend = backend
+        self.channel = channel
+        self.queue = queue.Queue(maxsize=SUBSCRIPTION_QUEUE_SIZE)
+
+    def put(self, data):
+        try:
+            self.queue.put_nowait(data)
+        except queue.Full:
+            # Медленный клиент: пропускаем событие, а не копим память
+            pass
+
+    def get(self, timeout=None):
+        """Следующее событие или None, если за timeout ничего не пришло"""
+        try:
+            return self.queue.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+    def close(self):
+        self.backend.unsubscribe(self)
+
+
+class InProcessBackend:
+    """Pub/sub в памяти процесса"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.subscriptions = {}
+
+    def subscribe(self, channel):
+        subscription = Subscription(self, channel)
+        with self.lock:
+            self.subscriptions.setdefault(channel, set()).add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self.lock:
+            channel = self.subscriptions.get(subscription.channel, set())
+            channel.discard(subscription)
+            if not channel:
+                self.subscriptions.pop(subscription.channel, None)
+
+    def publish(self, channel, data):
+        with self.lock:
+            subscriptions = list(self.subscriptions.get(channel, ()))
+        for subscription in subscriptions:
+            subscription.put(data)
+
+
+@lru_cache(maxsize=None)
+def get_backend():
+    path = getattr(settings, 'BLOG_EVENTS_BACKEND', DEFAULT_EVENTS_BACKEND)
+    return import_string(path)()
+
+
+def post_channel(post_id):
+    return f'post:{post_id}'
+
+
+def serialize_comment(comment):
+    """Небольшое представление комментария для клиента"""
+    return {
+        'id': comment.id,
+        'author': comment.author.username,
+        'text': comment.text,
+        'created_at': comment.created_at.isoformat(),
+    }
+
+
+def publish_comment(comment):
+    get_backend().publish(
+        post_channel(comment.post_id), serialize_comment(comment)
+    )
@@ -0,0 +1,102 @@
+"""Потоковая выгрузка постов и комментариев в NDJSON"""
+
+import json
+import zlib
+from datetime import datetime, time, timedelta
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+
+from blog.models import Comments, Post
+
+# Сколько строк забирать из базы за один раз
+EXPORT_CHUNK_SIZE = 2000
+
+# Имя поля в выгрузке -> путь в ORM
+EXPORT_FIELDS = {
+    'posts': {
+        'id': 'id',
+        'title': 'title',
+        'text': 'text',
+        'pub_date': 'pub_date',
+        'created_at': 'created_at',
+        'is_published': 'is_published',
+        'author': 'author__username',
+        'category': 'category__slug',
+        'location': 'location__name',
+        'image': 'image',
+    },
+    'comments': {
+        'id': 'id',
+        'post': 'post_id',
+        'text': 'text',
+        'created_at': 'created_at',
+        'author': 'author__username',
+    },
+}
+
+
+def parse_day(value, name):
+    """Дата вида ГГГГ-ММ-ДД в начало этих суток с часовым поясом"""
+    day = parse_date(value) if value else None
+    if value and day is None:
+        raise ValueError(f'Некорректная дата в {name}: {value}')
+    if day is None:
+        return None
+    return timezone.make_aware(datetime.combine(day, time.min))
+
+
+def get_export_queryset(
+        kind, category=None, author=None, since=None, until=None):
+    """Строки для выгрузки в виде словарей.
+
+    kind – 'posts' или 'comments', category – slug категории,
+    author – имя пользователя, since/until – даты включительно.
+    """
+    if kind == 'posts':
+        queryset = Post.objects.all()
+        prefix, date_field = '', 'pub_date'
+    elif kind == 'comments':
+        queryset = Comments.objects.all()
+        prefix, date_field = 'post__', 'created_at'
+    else:
+        raise ValueError(f'Неизвестный тип выгрузки: {kind}')
+    if category:
+        queryset = queryset.filter(**{f'{prefix}category__slug': category})
+    if author:
+        queryset = queryset.filter(author__username=author)
+    since = parse_day(since, 'since')
+    until = parse_day(until, 'until')
+    if since:
+        queryset = queryset.filter(**{f'{date_field}__gte': since})
+    if until:
+        queryset = queryset.filter(
+            **{f'{date_field}__lt': until + timedelta(days=1)}
+        )
+    return queryset.order_by('id').values(*EXPORT_FIELDS[kind].values())
+
+
+def iter_ndjson(queryset, kind, chunk_size=EXPORT_CHUNK_SIZE):
+    """Строки NDJSON в байтах, по одной на объект.
+
+    Строки читаются курсором порциями по chunk_size, поэтому
+    память не растёт с размером таблицы.
+    """
+    fields = EXPORT_FIELDS[kind].items()
+    for row in queryset.iterator(chunk_size=chunk_size):
+        item = {name: row[path] for name, path in fields}
+        yield (
+            json.dumps(item, cls=DjangoJSONEncoder, ensure_ascii=False)
+            + '\n'
+        ).encode()
+
+
+def iter_gzip(chunks, level=6):
+    """Сжимаем поток байтов в gzip на лету"""
+    compressor = zlib.compressobj(level, zlib.DEFLATED, zlib.MAX_WBITS | 16)
+    for chunk in chunks:
+        compressed = compressor.compress(chunk)
+        if compressed:
+            yield compressed
+    yield compressor.flush()
@@ -1,11 +1,36 @@
 from django import forms
+from django.core.exceptions import ValidationError
 
 from .models import Post, Comments
+from .upload_handlers import check_dimensions
 
 
-class PostForm(forms.ModelForm):
+class ImageLimitFormMixin:
+    """Показывает ошибки картинок, отброшенных ImageLimitUploadHandler"""
+
+    upload_errors = {}
+
+    def clean_image(self):
+        if 'image' in self.upload_errors:
+            raise ValidationError(self.upload_errors['image'])
+        image = self.cleaned_data['image']
+        # У новой загрузки ImageField уже прочитал размеры из заголовка
+        size = getattr(getattr(image, 'image', None), 'size', None)
+        if size:
+            message = check_dimensions(*size)
+            if message:
+                raise ValidationError(message)
+        return image
+
+
+class PostForm(ImageLimitFormMixin, forms.ModelForm):
     """Форма для создания поста"""
 
+    def __init__(self, *args, upload_errors=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        # Файлы, отброшенные ImageLimitUploadHandler при приёме
+        self.upload_errors = upload_errors or {}
+
     class Meta:
         model = Post
         exclude = ('author',)
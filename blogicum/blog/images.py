@@ -0,0 +1,123 @@
+"""Уменьшенные копии картинок постов для srcset"""
+
+import logging
+import os
+import re
+from io import BytesIO
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from PIL import Image
+
+logger = logging.getLogger(__name__)
+
+# posts_images/ab/cd/abcd….w640.jpg – копия шириной 640 px
+rendition_re = re.compile(r'^(?P<base>.+)\.w(?P<width>\d+)(?P<ext>\.\w+)$')
+SAVE_OPTIONS = {
+    'JPEG': {'quality': 85, 'optimize': True, 'progressive': True},
+    'PNG': {'optimize': True},
+    'WEBP': {'quality': 80},
+}
+
+
+def get_rendition_widths():
+    return getattr(settings, 'POST_IMAGE_RENDITION_WIDTHS', (320, 640, 1280))
+
+
+def rendition_name(name, width):
+    base, ext = os.path.splitext(name)
+    return f'{base}.w{width}{ext}'
+
+
+def original_name(name):
+    """Имя исходной картинки для имени копии или само имя"""
+    match = rendition_re.match(name)
+    if match is None:
+        return name
+    return match['base'] + match['ext']
+
+
+def build_renditions(field_file):
+    """Создаёт копии картинки под ширины из настроек.
+
+    Возвращает список для ключа renditions в Post.image_meta:
+    {'name', 'width', 'height'} по возрастанию ширины, последней
+    идёт сама картинка. Имена копий выводятся из имени картинки,
+    поэтому для одинаковых загрузок копии тоже общие.
+    """
+    storage = field_file.storage
+    with field_file.open('rb'), Image.open(field_file) as image:
+        width, height = image.size
+        renditions = []
+        # У анимации уменьшили бы только первый кадр
+        if image.format in SAVE_OPTIONS and not getattr(
+                image, 'is_animated', False):
+            image.load()
+            for target in get_rendition_widths():
+                if target >= width:
+                    break
+                target_height = max(round(height * target / width), 1)
+                name = rendition_name(field_file.name, target)
+                if not storage.exists(name):
+                    buffer = BytesIO()
+                    image.resize(
+                        (target, target_height), Image.Resampling.LANCZOS
+                    ).save(buffer, image.format, **SAVE_OPTIONS[image.format])
+                    storage.save_exact(name, ContentFile(buffer.getvalue()))
+                renditions.append(
+                    {'name': name, 'width': target, 'height': target_height}
+                )
+    renditions.append(
+        {'name': field_file.name, 'width': width, 'height': height}
+    )
+    return renditions
+
+
+def read_image_metadata(field_file):
+    """Размеры, формат и вес картинки.
+
+    Image.open читает только заголовок файла, пиксели не распаковываются.
+    """
+    with field_file.open('rb'), Image.open(field_file) as image:
+        width, height = image.size
+        image_format = image.format or ''
+    return {
+        'width': width,
+        'height': height,
+        'format': image_format,
+        'bytes': field_file.size,
+    }
+
+
+def describe_image(field_file, renditions=True, meta=None):
+    """Значение Post.image_meta для картинки.
+
+    Без renditions копии не создаются, а берутся из прежнего meta.
+    Если и там их нет, ключа renditions не будет: копии достроит
+    backfill_image_metadata --renditions.
+    """
+    if not field_file:
+        return {}
+    previous, meta = meta or {}, {}
+    if not renditions and 'renditions' in previous:
+        meta['renditions'] = previous['renditions']
+    try:
+        meta.update(read_image_metadata(field_file))
+        if renditions:
+            meta['renditions'] = build_renditions(field_file)
+    except (OSError, ValueError, Image.DecompressionBombError):
+        logger.exception('Не удалось прочитать %s', field_file.name)
+    return meta
+
+
+def delete_renditions(storage, name):
+    """Удаляет все копии картинки, какие бы ширины ни были в настройках"""
+    directory, filename = os.path.split(name)
+    prefix = os.path.splitext(filename)[0] + '.w'
+    try:
+        _, files = storage.listdir(directory)
+    except FileNotFoundError:
+        return
+    for file in files:
+        if file.startswith(prefix):
+            storage.delete(f'{directory}/{file}' if directory else file)
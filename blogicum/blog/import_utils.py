@@ -0,0 +1,173 @@
+"""Быстрая загрузка дампов в формате dumpdata/loaddata"""
+
+import json
+from collections import Counter, defaultdict
+
+from django.apps import apps
+from django.core.management.color import no_style
+from django.db import connections, transaction
+
+from .invalidation import invalidate_all
+
+# Модели, которые умеем загружать, в порядке зависимостей
+IMPORT_MODELS = (
+    'auth.user',
+    'blog.category',
+    'blog.location',
+    'blog.post',
+    'blog.comments',
+)
+# Сколько объектов одной модели вставлять одним запросом
+IMPORT_BATCH_SIZE = 5000
+# Размер куска файла, читаемого за раз
+READ_CHUNK_SIZE = 64 * 1024
+
+
+def iter_fixture_objects(stream, chunk_size=READ_CHUNK_SIZE):
+    """Объекты из JSON-массива по одному, без чтения файла целиком"""
+    decoder = json.JSONDecoder()
+    buffer = ''
+    position = 0
+    started = False
+    eof = False
+    while True:
+        # Пропускаем пробелы, начало массива и запятые между объектами
+        while position < len(buffer) and (
+            buffer[position].isspace()
+            or buffer[position] == ','
+            or (buffer[position] == '[' and not started)
+        ):
+            started = started or buffer[position] == '['
+            position += 1
+        if position < len(buffer) and buffer[position] == ']':
+            return
+        try:
+            obj, end = decoder.raw_decode(buffer, position)
+        except json.JSONDecodeError:
+            if eof:
+                if buffer[position:].strip():
+                    raise
+                return
+            chunk = stream.read(chunk_size)
+            eof = not chunk
+            buffer = buffer[position:] + chunk
+            position = 0
+            continue
+        yield obj
+        position = end
+
+
+def build_instance(model, data):
+    """Объект модели из записи дампа без обращений к базе"""
+    fields = data['fields']
+    values = {}
+    for field in model._meta.concrete_fields:
+        if field.primary_key or field.name not in fields:
+            continue
+        value = fields[field.name]
+        if field.remote_field:
+            if isinstance(value, list):
+                raise ValueError(
+                    'Natural keys не поддерживаются: '
+                    f'{data["model"]}.{field.name}'
+                )
+            values[field.attname] = value
+        else:
+            values[field.attname] = field.to_python(value)
+    return model(pk=data['pk'], **values)
+
+
+def build_m2m_rows(model, data):
+    """Строки промежуточных таблиц для полей many-to-many"""
+    for field in model._meta.many_to_many:
+        through = field.remote_field.through
+        for value in data['fields'].get(field.name) or ():
+            yield through, through(**{
+                f'{field.m2m_field_name()}_id': data['pk'],
+                f'{field.m2m_reverse_field_name()}_id': value,
+            })
+
+
+class BulkImporter:
+    """Загрузка дампа через bulk_create.
+
+    Объекты копятся по моделям и вставляются пачками в одной транзакции,
+    проверка внешних ключей откладывается до конца загрузки.
+    bulk_create не вызывает save() и не отправляет сигналы моделей.
+    """
+
+    def __init__(
+            self, using='default', batch_size=IMPORT_BATCH_SIZE,
+            ignore_conflicts=False):
+        self.using = using
+        self.batch_size = batch_size
+        self.ignore_conflicts = ignore_conflicts
+        self.models = {
+            label: apps.get_model(label) for label in IMPORT_MODELS
+        }
+        self.pending = defaultdict(list)
+        self.created = Counter()
+        self.skipped = Counter()
+
+    def add(self, data):
+        model = self.models.get(data['model'])
+        if model is None:
+            self.skipped[data['model']] += 1
+            return
+        self._add(model, build_instance(model, data))
+        for through, row in build_m2m_rows(model, data):
+            self._add(through, row)
+
+    def _add(self, model, instance):
+        self.pending[model].append(instance)
+        if len(self.pending[model]) >= self.batch_size:
+            self._flush(model)
+
+    def _flush(self, model):
+        objects = self.pending.pop(model, [])
+        if objects:
+            model.objects.using(self.using).bulk_create(
+                objects,
+                batch_size=self.batch_size,
+                ignore_conflicts=self.ignore_conflicts,
+            )
+            self.created[model._meta.label_lower] += len(objects)
+
+    def run(self, objects):
+        """Загружаем объекты и перестраиваем служебные данные"""
+        connection = connections[self.using]
+        with transaction.atomic(using=self.using):
+            with connection.constraint_checks_disabled():
+                for data in objects:
+                    self.add(data)
+                for model in list(self.pending):
+                    self._flush(model)
+            touched = [
+                model for model in self.models.values()
+                if self.created[model._meta.label_lower]
+            ]
+            connection.check_constraints(
+                table_names=[model._meta.db_table for model in touched]
+            )
+            self.reset_sequences(touched)
+        self.analyze()
+        # bulk_create не отправляет сигналы, сбрасываем кэш сами
+        invalidate_all()
+        return self.created
+
+    def reset_sequences(self, models):
+        """После вставки с явными pk сдвигаем счётчики автоинкремента"""
+        connection = connections[self.using]
+        statements = connection.ops.sequence_reset_sql(no_style(), models)
+        with connection.cursor() as cursor:
+            for sql in statements:
+                cursor.execute(sql)
+
+    def analyze(self):
+        """Обновляем статистику планировщика, в том числе оценки числа
+        строк для EstimatedCountPaginator
+        """
+        connection = connections[self.using]
+        if connection.vendor in ('sqlite', 'postgresql'):
+            with connection.cursor() as cursor:
+                cursor.execute('ANALYZE')
@@ -0,0 +1,115 @@
+"""Сброс кэша при изменении данных блога.
+
+Кэшированные страницы принадлежат группам: 'index', 'category:<slug>',
+'profile:<username>', 'post:<id>', общим для лент 'feeds' и для страниц
+постов 'details' и общей для всех 'all'. Карточки постов – группам
+'post:<id>', 'author:<id>', 'cat:<id категории>' и 'loc:<id локации>',
+список опубликованных категорий – группе 'categories'. У каждой группы есть
+поколение – случайная метка в кэше, которая входит в ключи страниц.
+Сброс группы – новая метка: старые ключи больше не используются
+и вытесняются кэшем сами, перебирать их не нужно.
+
+Изменения внутри транзакции копятся и сбрасываются одним
+запросом к кэшу после коммита. О сброшенных группах сообщает сигнал
+groups_purged – по нему чистятся кэши в памяти процесса.
+"""
+
+import threading
+import uuid
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from django.dispatch import Signal
+
+GENERATION_PREFIX = 'blog:gen'
+# Группа, в которую входят все страницы
+ALL = 'all'
+
+_pending = threading.local()
+
+# Отправляется с groups – множеством сброшенных групп
+groups_purged = Signal()
+
+
+def get_page_cache():
+    return caches[getattr(settings, 'PAGE_CACHE_ALIAS', 'default')]
+
+
+def generation_key(group):
+    return f'{GENERATION_PREFIX}:{group}'
+
+
+def get_generations(groups):
+    """Поколения групп в том же порядке, одним запросом к кэшу"""
+    cache = get_page_cache()
+    keys = [generation_key(group) for group in groups]
+    generations = cache.get_many(keys)
+    missing = {
+        key: uuid.uuid4().hex[:8] for key in keys if key not in generations
+    }
+    if missing:
+        # add, чтобы не перезаписать метку, созданную параллельно
+        for key, value in missing.items():
+            if not cache.add(key, value, None):
+                value = cache.get(key, value)
+            generations[key] = value
+    return [generations[key] for key in keys]
+
+
+def purge(groups):
+    """Новые поколения для групп одним запросом к кэшу"""
+    get_page_cache().set_many({
+        generation_key(group): uuid.uuid4().hex[:8] for group in groups
+    }, None)
+    groups_purged.send(sender=None, groups=groups)
+
+
+def flush():
+    groups, _pending.groups = getattr(_pending, 'groups', set()), set()
+    if groups:
+        purge(groups)
+
+
+def invalidate(*groups, using=None):
+    """Сбрасывает группы после коммита текущей транзакции.
+
+    Вне транзакции сбрасывает сразу. Повторы внутри одной
+    транзакции схлопываются.
+    """
+    groups = {group for group in groups if group}
+    if not groups:
+        return
+    connection = transaction.get_connection(using)
+    if not connection.in_atomic_block:
+        purge(groups)
+        return
+    if not any(item[1] is flush for item in connection.run_on_commit):
+        # Первое изменение в транзакции. Группы, оставшиеся от
+        # откаченной транзакции, сбрасывать не нужно
+        _pending.groups = set()
+        transaction.on_commit(flush, using=using)
+    _pending.groups |= groups
+
+
+def post_groups(*posts):
+    """Группы страниц, на которых видны посты"""
+    groups = {'index'}
+    for post in posts:
+        groups.add(f'post:{post["id"]}')
+        if post.get('category__slug'):
+            groups.add(f'category:{post["category__slug"]}')
+        if post.get('author__username'):
+            groups.add(f'profile:{post["author__username"]}')
+    return groups
+
+
+def invalidate_posts(queryset):
+    """Для массовых изменений в обход сигналов: update, bulk_create"""
+    invalidate(*post_groups(*queryset.values(
+        'id', 'category__slug', 'author__username'
+    )))
+
+
+def invalidate_all():
+    invalidate(ALL)
@@ -0,0 +1,205 @@
+"""Кэш справочников Category и Location в памяти процесса.
+
+Категорий и локаций мало, и меняются они редко, а нужны почти в каждом
+запросе к ленте. Поэтому они хранятся в ограниченном по размеру LRU-кэше
+процесса с коротким временем жизни записей.
+
+Каждая запись хранит поколения своих групп сброса ('cat:<id>',
+'loc:<id>', 'categories'), при которых она загружена. Поколения
+лежат в общем кэше, поэтому изменение в одном процессе сразу делает
+записи других процессов устаревшими: карточка или лента не попадут
+в кэш под новой версией со старыми данными справочника. Поэтому,
+как и кэшу страниц, нужен общий для процессов бэкенд кэша.
+Изменения в своём процессе, кроме того, сбрасывают записи сразу.
+"""
+
+import copy
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+
+from blog.models import Category, Location
+from .invalidation import ALL, get_generations
+
+_MISSING = object()
+
+
+def get_timeout():
+    """Время жизни записей в секундах, 0 – кэш выключен"""
+    return getattr(settings, 'LOOKUP_CACHE_TIMEOUT', 0)
+
+
+def lookup_cache_enabled():
+    return get_timeout() > 0
+
+
+class LRUCache:
+    """Потокобезопасный LRU-кэш с временем жизни записей"""
+
+    def __init__(self):
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._data)
+
+    def get(self, key, default=None):
+        with self._lock:
+            item = self._data.get(key, _MISSING)
+            if item is _MISSING:
+                return default
+            value, expires = item
+            if expires <= time.monotonic():
+                del self._data[key]
+                return default
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        expires = time.monotonic() + get_timeout()
+        maxsize = getattr(settings, 'LOOKUP_CACHE_SIZE', 512)
+        with self._lock:
+            self._data[key] = (value, expires)
+            self._data.move_to_end(key)
+            while len(self._data) > maxsize:
+                self._data.popitem(last=False)
+
+    def discard(self, *keys):
+        with self._lock:
+            for key in keys:
+                self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+
+_cache = LRUCache()
+
+
+def category_groups(pk):
+    return (ALL, f'cat:{pk}')
+
+
+def location_groups(pk):
+    return (ALL, f'loc:{pk}')
+
+
+# Меняется при изменении любой категории
+PUBLISHED_GROUPS = (ALL, 'categories')
+
+
+def get_lookup_generations(category_ids=(), location_ids=()):
+    """Поколения групп справочников одним запросом к общему кэшу"""
+    groups = set(PUBLISHED_GROUPS)
+    for pk in category_ids:
+        groups.update(category_groups(pk))
+    for pk in location_ids:
+        groups.update(location_groups(pk))
+    groups = sorted(groups)
+    return dict(zip(groups, get_generations(groups)))
+
+
+def _version(groups, generations):
+    return tuple(generations[group] for group in groups)
+
+
+def _get_fresh(key, version):
+    """Запись кэша, если она загружена при тех же поколениях групп"""
+    item = _cache.get(key)
+    if item is not None and item[1] == version:
+        return item[0]
+    return None
+
+
+def _get_many(kind, model, group_func, ids, generations):
+    """Копии объектов по id: из кэша, недостающие одним запросом к базе"""
+    found, missing = {}, set()
+    for pk in ids:
+        obj = _get_fresh((kind, pk), _version(group_func(pk), generations))
+        if obj is None:
+            missing.add(pk)
+        else:
+            found[pk] = obj
+    if missing:
+        for pk, obj in model.objects.in_bulk(missing).items():
+            version = _version(group_func(pk), generations)
+            _cache.set((kind, pk), (obj, version))
+            found[pk] = obj
+    # Объекты в кэше общие для потоков, наружу отдаём копии
+    return {pk: copy.copy(obj) for pk, obj in found.items()}
+
+
+def get_categories(ids, generations=None):
+    """Категории по id, generations – из get_lookup_generations"""
+    if generations is None:
+        generations = get_lookup_generations(category_ids=ids)
+    return _get_many('cat', Category, category_groups, ids, generations)
+
+
+def get_locations(ids, generations=None):
+    """Локации по id, generations – из get_lookup_generations"""
+    if generations is None:
+        generations = get_lookup_generations(location_ids=ids)
+    return _get_many('loc', Location, location_groups, ids, generations)
+
+
+def get_category_by_slug(slug):
+    """Категория по slug или None"""
+    pk = _cache.get(('cat-slug', slug))
+    if pk is not None:
+        category = get_categories([pk]).get(pk)
+        # Slug мог смениться, тогда запись индекса устарела
+        if category is not None and category.slug == slug:
+            return category
+    category = Category.objects.filter(slug=slug).first()
+    if category is not None:
+        generations = get_lookup_generations(category_ids=[category.pk])
+        _cache.set(('cat', category.pk), (
+            category,
+            _version(category_groups(category.pk), generations),
+        ))
+        _cache.set(('cat-slug', slug), category.pk)
+        category = copy.copy(category)
+    return category
+
+
+def get_published_category_ids():
+    """Множество id опубликованных категорий, для фильтра лент без JOIN"""
+    version = _version(PUBLISHED_GROUPS, get_lookup_generations())
+    ids = _get_fresh(('cat-published',), version)
+    if ids is None:
+        ids = frozenset(
+            Category.objects.filter(is_published=True)
+            .values_list('pk', flat=True)
+        )
+        _cache.set(('cat-published',), (ids, version))
+    return ids
+
+
+def forget_category(pk):
+    _cache.discard(('cat', pk), ('cat-published',))
+
+
+def forget_location(pk):
+    _cache.discard(('loc', pk))
+
+
+def forget_groups(groups):
+    """Сбрасывает записи по группам шины сброса кэша"""
+    for group in groups:
+        kind, _, pk = group.partition(':')
+        if group == ALL:
+            clear()
+        elif group == 'categories':
+            _cache.discard(('cat-published',))
+        elif kind == 'cat' and pk.isdigit():
+            forget_category(int(pk))
+        elif kind == 'loc' and pk.isdigit():
+            forget_location(int(pk))
+
+
+def clear():
+    _cache.clear()
@@ -0,0 +1,8 @@
+from django.test import override_settings
+
+# Настройки для команд, которые ходят по сайту тестовым клиентом:
+# без DEBUG, чтобы в ответы не встраивалась debug toolbar,
+# и с хостом тестового клиента в ALLOWED_HOSTS
+IN_PROCESS_CLIENT_SETTINGS = override_settings(
+    DEBUG=False, ALLOWED_HOSTS=['testserver']
+)
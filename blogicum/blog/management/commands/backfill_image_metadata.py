@@ -0,0 +1,91 @@
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Q
+
+from blog.images import describe_image
+from blog.invalidation import invalidate_posts
+from blog.models import Post
+
+BATCH_SIZE = 200
+
+
+class Command(BaseCommand):
+    help = (
+        'Заполняет размеры, формат и вес картинок постов, '
+        'сохранённых до появления метаданных'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=8)
+        parser.add_argument('--batch-size', type=int, default=BATCH_SIZE)
+        parser.add_argument(
+            '--renditions', action='store_true',
+            help=(
+                'Также создать уменьшенные копии (читает файлы целиком) '
+                'для постов, у которых их ещё нет. Запускается '
+                'по расписанию: при сохранении поста копии не строятся'
+            ),
+        )
+        parser.add_argument(
+            '--all', action='store_true',
+            help='Обновить все посты, а не только без метаданных',
+        )
+
+    def save_renditions(self, batch):
+        """Сохраняет метаданные, если картинку постов не сменили"""
+        with transaction.atomic():
+            for post in batch:
+                Post.objects.filter(
+                    id=post.id, image=post.image.name
+                ).update(image_meta=post.image_meta)
+            # В srcset страниц появились копии
+            invalidate_posts(
+                Post.objects.filter(id__in=[post.id for post in batch])
+            )
+
+    def handle(self, *args, **options):
+        queryset = Post.objects.exclude(image='').only(
+            'id', 'image', 'image_meta'
+        )
+        if options['renditions'] and not options['all']:
+            queryset = queryset.filter(
+                ~Q(image_meta__has_key='width')
+                | ~Q(image_meta__has_key='renditions')
+            )
+        elif not options['all']:
+            queryset = queryset.exclude(image_meta__has_key='width')
+
+        def describe(post):
+            # В потоках только чтение файлов, база – в основном потоке
+            post.image_meta = describe_image(
+                post.image,
+                renditions=options['renditions'],
+                meta=post.image_meta,
+            )
+            return 'width' in post.image_meta
+
+        updated = failed = 0
+        last_id = 0
+        with ThreadPoolExecutor(max_workers=options['workers']) as executor:
+            while True:
+                batch = list(
+                    queryset.filter(id__gt=last_id).order_by('id')[
+                        :options['batch_size']
+                    ]
+                )
+                if not batch:
+                    break
+                last_id = batch[-1].id
+                failed += list(executor.map(describe, batch)).count(False)
+                if options['renditions']:
+                    self.save_renditions(batch)
+                else:
+                    Post.objects.bulk_update(batch, ['image_meta'])
+                updated += len(batch)
+                if options['verbosity'] > 1:
+                    self.stdout.write(f'Обработано постов: {updated}')
+        self.stdout.write(
+            f'Обновлено постов: {updated}, не удалось прочитать: {failed}'
+        )
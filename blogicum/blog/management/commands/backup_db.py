@@ -0,0 +1,62 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from blog.backup_utils import (BACKUP_PAGES_PER_STEP, BACKUP_STEP_PAUSE,
+                               BackupError, create_backup, rotate_snapshots)
+
+
+def get_sqlite_path(alias):
+    """Путь к файлу базы SQLite по алиасу из DATABASES"""
+    database = settings.DATABASES.get(alias)
+    if database is None:
+        raise CommandError(f'Нет базы {alias} в DATABASES')
+    if database['ENGINE'] != 'django.db.backends.sqlite3':
+        raise CommandError('Команда работает только с SQLite')
+    return database['NAME']
+
+
+class Command(BaseCommand):
+    help = 'Согласованная копия базы SQLite без остановки сайта'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--output-dir', default=settings.BASE_DIR / 'backups'
+        )
+        parser.add_argument('--database', default='default')
+        parser.add_argument(
+            '--compress', action='store_true', help='сжать копию в gzip'
+        )
+        parser.add_argument(
+            '--keep', type=int, default=0,
+            help='сколько последних копий хранить, 0 – все',
+        )
+        parser.add_argument(
+            '--pages', type=int, default=BACKUP_PAGES_PER_STEP,
+            help='страниц за один шаг копирования',
+        )
+        parser.add_argument(
+            '--pause', type=float, default=BACKUP_STEP_PAUSE,
+            help='пауза между шагами в секундах',
+        )
+
+    def handle(self, *args, **options):
+        source = get_sqlite_path(options['database'])
+        try:
+            path, stats = create_backup(
+                source,
+                options['output_dir'],
+                compress=options['compress'],
+                pages=options['pages'],
+                pause=options['pause'],
+            )
+        except BackupError as error:
+            raise CommandError(error)
+        megabytes = stats['bytes'] / 1024 / 1024
+        throughput = megabytes / stats['seconds'] if stats['seconds'] else 0
+        self.stdout.write(self.style.SUCCESS(
+            f'Копия {path}: {stats["pages"]} страниц, {megabytes:.1f} МБ '
+            f'за {stats["seconds"]:.2f} с ({throughput:.1f} МБ/с)'
+        ))
+        removed = rotate_snapshots(options['output_dir'], options['keep'])
+        for path in removed:
+            self.stdout.write(f'Удалена старая копия {path}')
@@ -0,0 +1,66 @@
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand
+from django.test import AsyncClient, Client
+
+from blog.management import IN_PROCESS_CLIENT_SETTINGS
+
+
+class Command(BaseCommand):
+    help = (
+        'Сравнивает пропускную способность синхронной (WSGI) и '
+        'асинхронной (ASGI) версии страницы при параллельных запросах'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('sync_url', nargs='?', default='/')
+        parser.add_argument('async_url', nargs='?', default='/async/')
+        parser.add_argument('--requests', type=int, default=200)
+        parser.add_argument('--concurrency', type=int, default=20)
+
+    def run_sync(self, url, total, concurrency):
+        def fetch(_):
+            return Client().get(url).status_code
+
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            return list(executor.map(fetch, range(total)))
+
+    async def run_async(self, url, total, concurrency):
+        semaphore = asyncio.Semaphore(concurrency)
+        client = AsyncClient()
+
+        async def fetch():
+            async with semaphore:
+                response = await client.get(url)
+                return response.status_code
+
+        return await asyncio.gather(*(fetch() for _ in range(total)))
+
+    def report(self, name, statuses, elapsed):
+        errors = sum(status != 200 for status in statuses)
+        self.stdout.write(
+            f'{name}: {len(statuses) / elapsed:.1f} запросов/с, '
+            f'{elapsed:.2f} с, ошибок: {errors}'
+        )
+
+    @IN_PROCESS_CLIENT_SETTINGS
+    def handle(self, *args, **options):
+        total = options['requests']
+        concurrency = options['concurrency']
+        self.stdout.write(
+            f'{total} запросов, {concurrency} одновременно'
+        )
+
+        started = time.monotonic()
+        statuses = self.run_sync(options['sync_url'], total, concurrency)
+        self.report('WSGI ' + options['sync_url'], statuses,
+                    time.monotonic() - started)
+
+        started = time.monotonic()
+        statuses = asyncio.run(
+            self.run_async(options['async_url'], total, concurrency)
+        )
+        self.report('ASGI ' + options['async_url'], statuses,
+                    time.monotonic() - started)
@@ -0,0 +1,46 @@
+import time
+
+from django.contrib.sessions.models import Session
+from django.core.management.base import BaseCommand
+from django.db import router, transaction
+from django.utils import timezone
+
+BATCH_SIZE = 500
+
+
+class Command(BaseCommand):
+    help = (
+        'Удаляет просроченные сессии небольшими порциями, '
+        'не блокируя базу надолго'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=BATCH_SIZE)
+        parser.add_argument(
+            '--pause', type=float, default=0.1,
+            help='Пауза между порциями в секундах',
+        )
+
+    def handle(self, *args, **options):
+        # Команда работает там же, куда пишет SessionStore
+        database = router.db_for_write(Session)
+        expired = Session.objects.using(database).filter(
+            expire_date__lt=timezone.now()
+        )
+        deleted = 0
+        while True:
+            # Каждая порция – отдельная короткая транзакция
+            with transaction.atomic(using=database):
+                keys = list(expired.values_list(
+                    'session_key', flat=True
+                )[:options['batch_size']])
+                if not keys:
+                    break
+                Session.objects.using(database).filter(
+                    session_key__in=keys
+                ).delete()
+            deleted += len(keys)
+            if options['verbosity'] > 1:
+                self.stdout.write(f'Удалено сессий: {deleted}')
+            time.sleep(options['pause'])
+        self.stdout.write(f'Удалено просроченных сессий: {deleted}')
@@ -0,0 +1,57 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from blog.export_utils import (EXPORT_CHUNK_SIZE, EXPORT_FIELDS,
+                               get_export_queryset, iter_gzip, iter_ndjson)
+
+
+class Command(BaseCommand):
+    help = 'Выгружает посты или комментарии в формате NDJSON'
+
+    def add_arguments(self, parser):
+        parser.add_argument('kind', choices=sorted(EXPORT_FIELDS))
+        parser.add_argument('--category', help='slug категории')
+        parser.add_argument('--author', help='имя пользователя автора')
+        parser.add_argument('--since', help='с даты ГГГГ-ММ-ДД')
+        parser.add_argument('--until', help='по дату ГГГГ-ММ-ДД')
+        parser.add_argument(
+            '--gzip', action='store_true', help='сжать выгрузку в gzip'
+        )
+        parser.add_argument(
+            '-o', '--output', help='файл для выгрузки, по умолчанию stdout'
+        )
+        parser.add_argument(
+            '--chunk-size', type=int, default=EXPORT_CHUNK_SIZE
+        )
+
+    def handle(self, *args, **options):
+        try:
+            queryset = get_export_queryset(
+                options['kind'],
+                category=options['category'],
+                author=options['author'],
+                since=options['since'],
+                until=options['until'],
+            )
+        except ValueError as error:
+            raise CommandError(error)
+        chunks = iter_ndjson(
+            queryset, options['kind'], chunk_size=options['chunk_size']
+        )
+        if options['gzip']:
+            chunks = iter_gzip(chunks)
+        if options['output']:
+            with open(options['output'], 'wb') as output:
+                output.writelines(chunks)
+            return
+        buffer = getattr(self.stdout, 'buffer', None)
+        if buffer is not None:
+            buffer.writelines(chunks)
+            buffer.flush()
+        elif options['gzip']:
+            raise CommandError(
+                'Сжатую выгрузку можно записать только в файл '
+                'или в бинарный stdout.'
+            )
+        else:
+            for chunk in chunks:
+                self.stdout.write(chunk.decode(), ending='')
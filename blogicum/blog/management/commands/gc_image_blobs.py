@@ -0,0 +1,75 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.db.models import Count
+from django.utils import timezone
+
+from blog.images import delete_renditions
+from blog.models import ImageBlob, Post
+
+
+class Command(BaseCommand):
+    help = (
+        'Удаляет файлы картинок, на которые не ссылается ни один пост'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--grace-minutes', type=int, default=60,
+            help='Не трогать файлы, число ссылок которых менялось недавно',
+        )
+        parser.add_argument(
+            '--recount', action='store_true',
+            help='Пересчитать ссылки по постам, например после импорта',
+        )
+        parser.add_argument('--dry-run', action='store_true')
+
+    def recount(self):
+        counts = dict(
+            Post.objects.exclude(image='').values_list('image').annotate(
+                count=Count('id')
+            ).values_list('image', 'count')
+        )
+        changed = 0
+        for blob in ImageBlob.objects.iterator():
+            count = counts.pop(blob.name, 0)
+            if blob.ref_count != count:
+                blob.ref_count = count
+                blob.save(update_fields=('ref_count', 'updated_at'))
+                changed += 1
+        ImageBlob.objects.bulk_create([
+            ImageBlob(name=name, ref_count=count)
+            for name, count in counts.items()
+        ])
+        self.stdout.write(
+            f'Исправлено счётчиков: {changed}, добавлено файлов: {len(counts)}'
+        )
+
+    def handle(self, *args, **options):
+        if options['recount'] and not options['dry_run']:
+            self.recount()
+        storage = Post._meta.get_field('image').storage
+        orphans = ImageBlob.objects.filter(
+            ref_count=0,
+            updated_at__lt=timezone.now() - timedelta(
+                minutes=options['grace_minutes']
+            ),
+        )
+        deleted = 0
+        for blob in orphans.iterator():
+            # Счётчик мог разойтись с постами, например после bulk_create
+            if Post.objects.filter(image=blob.name).exists():
+                continue
+            if not options['dry_run']:
+                # Пока шёл обход, на файл мог сослаться новый пост:
+                # удаляем запись, только если ссылок всё ещё нет
+                removed, _ = orphans.filter(pk=blob.pk).delete()
+                if not removed:
+                    continue
+                storage.delete(blob.name)
+                delete_renditions(storage, blob.name)
+            if options['verbosity'] > 1:
+                self.stdout.write(blob.name)
+            deleted += 1
+        verb = 'Будет удалено' if options['dry_run'] else 'Удалено'
+        self.stdout.write(f'{verb} файлов: {deleted}')
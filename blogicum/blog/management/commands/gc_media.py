@@ -0,0 +1,106 @@
+import os
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from blog.images import original_name
+from blog.models import ImageBlob, Post
+
+BATCH_SIZE = 1000
+
+
+def iter_files(root):
+    """Файлы каталога и подкаталогов без построения полного списка"""
+    stack = [root]
+    while stack:
+        with os.scandir(stack.pop()) as entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    stack.append(entry.path)
+                elif entry.is_file(follow_symlinks=False):
+                    yield entry
+
+
+def iter_batches(iterable, size):
+    batch = []
+    for item in iterable:
+        batch.append(item)
+        if len(batch) == size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+class Command(BaseCommand):
+    help = (
+        'Удаляет из каталога картинок постов файлы, '
+        'на которые не ссылается ни один пост'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--grace-minutes', type=int, default=60,
+            help='Не трогать файлы моложе, их пост может ещё сохраняться',
+        )
+        parser.add_argument('--batch-size', type=int, default=BATCH_SIZE)
+        parser.add_argument('--dry-run', action='store_true')
+
+    def handle(self, *args, **options):
+        field = Post._meta.get_field('image')
+        storage = field.storage
+        root = storage.path(field.upload_to)
+        if not os.path.isdir(root):
+            raise CommandError(f'Каталог {root} не найден')
+        deadline = time.time() - options['grace_minutes'] * 60
+
+        files = (
+            entry for entry in iter_files(root)
+            if entry.stat().st_mtime < deadline
+        )
+        removed = removed_bytes = 0
+        for batch in iter_batches(files, options['batch_size']):
+            names = {
+                os.path.relpath(entry.path, storage.location).replace(
+                    os.sep, '/'
+                ): entry
+                for entry in batch
+            }
+            # Уменьшенная копия нужна, пока нужна исходная картинка
+            originals = {name: original_name(name) for name in names}
+            referenced = set(
+                Post.objects.filter(
+                    image__in=set(originals.values())
+                ).values_list('image', flat=True)
+            )
+            orphans = [
+                name for name in names
+                if originals[name] not in referenced
+            ]
+            for name in orphans:
+                size = names[name].stat().st_size
+                if options['verbosity'] > 1:
+                    self.stdout.write(f'{name} ({size} байт)')
+                if not options['dry_run']:
+                    os.remove(names[name].path)
+                removed += 1
+                removed_bytes += size
+            if orphans and not options['dry_run']:
+                ImageBlob.objects.filter(name__in=orphans).delete()
+
+        if not options['dry_run']:
+            self.remove_empty_dirs(root)
+        verb = 'Будет удалено' if options['dry_run'] else 'Удалено'
+        self.stdout.write(
+            f'{verb} файлов: {removed}, {removed_bytes / 2**20:.1f} МБ'
+        )
+
+    def remove_empty_dirs(self, root):
+        # Снизу вверх, чтобы опустевший каталог шарда удалил и родителя
+        for path, _, _ in os.walk(root, topdown=False):
+            if path != root and not os.listdir(path):
+                try:
+                    os.rmdir(path)
+                except OSError:
+                    # В каталог успели что-то загрузить
+                    pass
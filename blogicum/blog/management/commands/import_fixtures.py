@@ -0,0 +1,47 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DatabaseError
+
+from blog.import_utils import (IMPORT_BATCH_SIZE, IMPORT_MODELS,
+                               BulkImporter, iter_fixture_objects)
+
+
+class Command(BaseCommand):
+    help = (
+        'Быстрая загрузка JSON-дампа (как у loaddata) через bulk_create. '
+        f'Загружаются модели: {", ".join(IMPORT_MODELS)}.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('fixture', help='путь к JSON-дампу')
+        parser.add_argument(
+            '--batch-size', type=int, default=IMPORT_BATCH_SIZE
+        )
+        parser.add_argument(
+            '--ignore-conflicts', action='store_true',
+            help='пропускать объекты, которые уже есть в базе',
+        )
+        parser.add_argument('--database', default='default')
+
+    def handle(self, *args, **options):
+        importer = BulkImporter(
+            using=options['database'],
+            batch_size=options['batch_size'],
+            ignore_conflicts=options['ignore_conflicts'],
+        )
+        started = time.monotonic()
+        try:
+            with open(options['fixture'], encoding='utf-8') as stream:
+                created = importer.run(iter_fixture_objects(stream))
+        except (OSError, ValueError, DatabaseError) as error:
+            raise CommandError(f'Загрузка не удалась: {error}')
+        elapsed = time.monotonic() - started
+        for label, count in created.items():
+            self.stdout.write(f'{label}: {count}')
+        for label, count in importer.skipped.items():
+            self.stdout.write(f'{label}: пропущено {count}')
+        self.stdout.write(self.style.SUCCESS(
+            f'Загружено {sum(created.values())} объектов '
+            f'за {elapsed:.1f} с'
+        ))
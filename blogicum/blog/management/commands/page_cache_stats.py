@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from blog.page_cache import get_cache_stats
+
+
+class Command(BaseCommand):
+    help = 'Показывает счётчики обращений к кэшу страниц'
+
+    def handle(self, *args, **options):
+        stats = get_cache_stats()
+        total = sum(stats.values())
+        for status, count in stats.items():
+            share = count / total * 100 if total else 0
+            self.stdout.write(f'{status}: {count} ({share:.1f}%)')
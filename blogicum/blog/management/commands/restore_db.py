@@ -0,0 +1,38 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+
+from blog.backup_utils import BackupError, restore_backup
+from .backup_db import get_sqlite_path
+
+
+class Command(BaseCommand):
+    help = (
+        'Восстанавливает базу SQLite из копии backup_db. '
+        'Копия проверяется PRAGMA integrity_check до подмены файла. '
+        'Перед восстановлением остановите процессы приложения.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('snapshot', help='файл копии (.sqlite3 или .gz)')
+        parser.add_argument('--database', default='default')
+        parser.add_argument(
+            '--noinput', action='store_false', dest='interactive'
+        )
+
+    def handle(self, *args, **options):
+        target = get_sqlite_path(options['database'])
+        if options['interactive']:
+            answer = input(
+                f'База {target} будет заменена копией '
+                f'{options["snapshot"]}. Продолжить? [y/N] '
+            )
+            if answer.lower() != 'y':
+                raise CommandError('Восстановление отменено')
+        connections[options['database']].close()
+        try:
+            restore_backup(options['snapshot'], target)
+        except BackupError as error:
+            raise CommandError(error)
+        self.stdout.write(self.style.SUCCESS(
+            f'База {target} восстановлена, прежняя сохранена в {target}.old'
+        ))
@@ -0,0 +1,138 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.db.models import Count, Q
+from django.test import Client
+from django.urls import reverse
+from django.utils import timezone
+
+from blog.management import IN_PROCESS_CLIENT_SETTINGS
+from blog.models import Category, Post
+from blog.invalidation import ALL, purge
+from blog.page_cache import get_page_cache_timeout
+from blog.query_utils import get_model_queryset
+
+
+def get_hot_urls(index_pages, limit, days):
+    """Адреса самых посещаемых страниц.
+
+    Статистики посещений нет, поэтому горячими считаем главную,
+    категории и профили с наибольшим числом свежих постов
+    и свежие посты с наибольшим числом комментариев.
+    """
+    since = timezone.now() - timedelta(days=days)
+    urls = [reverse('blog:index')]
+    urls += [
+        f'{reverse("blog:index")}?page={page}'
+        for page in range(2, index_pages + 1)
+    ]
+    recent = Q(posts__is_published=True, posts__pub_date__gte=since)
+    urls += [
+        reverse('blog:category_posts', args=[slug])
+        for slug in Category.objects.filter(is_published=True).annotate(
+            recent_count=Count('posts', filter=recent)
+        ).filter(recent_count__gt=0).order_by(
+            '-recent_count'
+        ).values_list('slug', flat=True)[:limit]
+    ]
+    urls += [
+        reverse('blog:profile', args=[username])
+        for username in get_model_queryset(
+            model_manager=Post.objects
+        ).filter(pub_date__gte=since).values('author__username').annotate(
+            recent_count=Count('id')
+        ).order_by('-recent_count').values_list(
+            'author__username', flat=True
+        )[:limit]
+    ]
+    urls += [
+        reverse('blog:post_detail', args=[post_id])
+        for post_id in get_model_queryset(add_annotation=True).filter(
+            pub_date__gte=since
+        ).order_by('-comment_count', '-pub_date').values_list(
+            'id', flat=True
+        )[:limit]
+    ]
+    return urls
+
+
+class Command(BaseCommand):
+    help = (
+        'Прогревает кэш страниц: заранее отрисовывает главную, '
+        'популярные категории, профили и посты'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--index-pages', type=int, default=3)
+        parser.add_argument(
+            '--limit', type=int, default=10,
+            help='Сколько категорий, профилей и постов прогревать',
+        )
+        parser.add_argument(
+            '--days', type=int, default=7,
+            help='За сколько дней учитывать посты',
+        )
+        parser.add_argument('--workers', type=int, default=4)
+        parser.add_argument(
+            '--keep', action='store_true',
+            help='Не сбрасывать уже закэшированные страницы',
+        )
+
+    def fetch(self, url):
+        response = Client().get(url)
+        return url, response.status_code, response.get('X-Page-Cache')
+
+    def fetch_in_thread(self, url):
+        # У каждого потока своё соединение с базой
+        try:
+            return self.fetch(url)
+        finally:
+            connection.close()
+
+    @IN_PROCESS_CLIENT_SETTINGS
+    def handle(self, *args, **options):
+        if not get_page_cache_timeout():
+            raise CommandError(
+                'Кэш страниц выключен, задайте PAGE_CACHE_TIMEOUT'
+            )
+        backend = settings.CACHES[
+            getattr(settings, 'PAGE_CACHE_ALIAS', 'default')
+        ]['BACKEND']
+        if backend.endswith(('LocMemCache', 'DummyCache')):
+            self.stderr.write(
+                f'Кэш {backend} не общий для процессов, '
+                'прогрев не будет виден серверу'
+            )
+
+        urls = get_hot_urls(
+            options['index_pages'], options['limit'], options['days']
+        )
+        if not options['keep']:
+            # После выкладки шаблоны могли измениться,
+            # поэтому сбрасываем весь кэш страниц
+            purge([ALL])
+        started = time.monotonic()
+        if options['workers'] > 1:
+            with ThreadPoolExecutor(
+                max_workers=options['workers']
+            ) as executor:
+                results = list(executor.map(self.fetch_in_thread, urls))
+        else:
+            results = [self.fetch(url) for url in urls]
+
+        warmed = 0
+        for url, status, cache_status in results:
+            if status == 200:
+                warmed += 1
+            else:
+                self.stderr.write(f'{url}: {status}')
+            if options['verbosity'] > 1:
+                self.stdout.write(f'{url}: {status} {cache_status}')
+        self.stdout.write(
+            f'Прогрето страниц: {warmed} из {len(results)} '
+            f'за {time.monotonic() - started:.2f} с'
+        )
@@ -0,0 +1,32 @@
+# Generated by Django 3.2.16 on 2026-10-19 09:23
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0009_post_image_meta'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ThrottledRequest',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('scope', models.CharField(max_length=20, verbose_name='Действие')),
+                ('key', models.CharField(max_length=150, verbose_name='Пользователь или IP')),
+                ('count', models.PositiveIntegerField(default=0, verbose_name='Отклонено запросов')),
+                ('last_at', models.DateTimeField(verbose_name='Последний раз')),
+            ],
+            options={
+                'verbose_name': 'ограниченный запрос',
+                'verbose_name_plural': 'Ограниченные запросы',
+                'ordering': ('-last_at',),
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='throttledrequest',
+            constraint=models.UniqueConstraint(fields=('scope', 'key'), name='throttled_request_unique'),
+        ),
+    ]
@@ -2,6 +2,8 @@ from django.contrib.auth import get_user_model
 from django.db import models
 from django.urls import reverse
 
+from .storage import ContentAddressedStorage
+
 # Добавляем константу с максимальной длиной поля
 TITLE_MAX_LENGTH = 256
 
@@ -107,8 +109,14 @@ class Post(BaseModel):
     image = models.ImageField(
         'Изображение',
         upload_to='posts_images',
+        storage=ContentAddressedStorage(),
         blank=True
     )
+    # Размеры, формат, вес и уменьшенные копии image. Заполняются при
+    # сохранении поста, чтобы не открывать файл при каждом обращении
+    image_meta = models.JSONField(
+        'Метаданные изображения', default=dict, blank=True, editable=False
+    )
 
     class Meta:
         verbose_name = 'публикация'
@@ -144,3 +152,47 @@ class Comments(models.Model):
         verbose_name_plural = 'Комментарии'
         ordering = ('created_at',)
         default_related_name = 'comments'
+        # Индекс под постраничную загрузку комментариев поста
+        indexes = (
+            models.Index(
+                fields=('post', 'created_at', 'id'),
+                name='comments_post_created_idx',
+            ),
+        )
+
+
+class ImageBlob(models.Model):
+    """Файл картинки и число постов, которые на него ссылаются"""
+
+    name = models.CharField('Путь к файлу', max_length=100, unique=True)
+    ref_count = models.PositiveIntegerField('Число ссылок', default=0)
+    updated_at = models.DateTimeField('Изменено', auto_now=True)
+
+    class Meta:
+        verbose_name = 'файл картинки'
+        verbose_name_plural = 'Файлы картинок'
+
+    def __str__(self):
+        return self.name
+
+
+class ThrottledRequest(models.Model):
+    """Сколько запросов отклонено из-за ограничения частоты"""
+
+    scope = models.CharField('Действие', max_length=20)
+    key = models.CharField('Пользователь или IP', max_length=150)
+    count = models.PositiveIntegerField('Отклонено запросов', default=0)
+    last_at = models.DateTimeField('Последний раз')
+
+    class Meta:
+        verbose_name = 'ограниченный запрос'
+        verbose_name_plural = 'Ограниченные запросы'
+        ordering = ('-last_at',)
+        constraints = (
+            models.UniqueConstraint(
+                fields=('scope', 'key'), name='throttled_request_unique'
+            ),
+        )
+
+    def __str__(self):
+        return f'{self.scope} {self.key}'
@@ -0,0 +1,196 @@
+"""Кэш страниц целиком для анонимных посетителей"""
+
+import time
+from hashlib import md5
+
+from django.conf import settings
+from django.http import HttpResponse
+
+from .invalidation import ALL, get_generations, get_page_cache
+
+PAGE_CACHE_PREFIX = 'blog:page'
+STATS_PREFIX = f'{PAGE_CACHE_PREFIX}:stats'
+# Результаты single_flight: свежая запись, пересчёт, устаревшая запись,
+# дождались чужого пересчёта, не дождались и посчитали сами
+CACHE_STATUSES = ('hit', 'miss', 'stale', 'coalesced', 'timeout')
+
+
+def get_page_cache_timeout():
+    """Время жизни страницы в кэше, 0 – кэш выключен"""
+    return getattr(settings, 'PAGE_CACHE_TIMEOUT', 0)
+
+
+def page_cache_key(path, generations=()):
+    """Ключ страницы. При сбросе любой из её групп ключ меняется"""
+    return (
+        f'{PAGE_CACHE_PREFIX}:{md5(path.encode()).hexdigest()}:'
+        + '.'.join(generations)
+    )
+
+
+def record_status(cache, status):
+    key = f'{STATS_PREFIX}:{status}'
+    cache.add(key, 0, None)
+    try:
+        cache.incr(key)
+    except ValueError:
+        # Счётчик вытеснили между add и incr
+        cache.set(key, 1, None)
+
+
+def get_cache_stats():
+    """Счётчики обращений к кэшу страниц по результатам"""
+    cache = get_page_cache()
+    values = cache.get_many(
+        [f'{STATS_PREFIX}:{status}' for status in CACHE_STATUSES]
+    )
+    return {
+        status: values.get(f'{STATS_PREFIX}:{status}', 0)
+        for status in CACHE_STATUSES
+    }
+
+
+def single_flight(cache, key, compute, timeout):
+    """Значение из кэша с пересчётом только в одном процессе.
+
+    Запись хранится дольше timeout на PAGE_CACHE_STALE секунд: пока
+    один процесс пересчитывает устаревшее значение, остальные отдают
+    старое. Если значения нет совсем, остальные ждут его до
+    PAGE_CACHE_WAIT секунд или пока не снята блокировка пересчёта.
+    compute может вернуть None, тогда результат не кэшируется.
+    Возвращает пару (значение, результат).
+    """
+    entry = cache.get(key)
+    if entry is not None and entry['expires'] > time.time():
+        status, value = 'hit', entry['value']
+    else:
+        lock_key = f'{key}:lock'
+        lock_timeout = getattr(settings, 'PAGE_CACHE_LOCK_TIMEOUT', 30)
+        if cache.add(lock_key, 1, lock_timeout):
+            try:
+                status, value = 'miss', compute()
+                if value is not None:
+                    cache.set(key, {
+                        'value': value,
+                        'expires': time.time() + timeout,
+                    }, timeout + getattr(settings, 'PAGE_CACHE_STALE', 60))
+            finally:
+                cache.delete(lock_key)
+        elif entry is not None:
+            status, value = 'stale', entry['value']
+        else:
+            status, value = 'timeout', None
+            poll = getattr(settings, 'PAGE_CACHE_POLL', 0.05)
+            deadline = time.monotonic() + getattr(
+                settings, 'PAGE_CACHE_WAIT', 2
+            )
+            while time.monotonic() < deadline:
+                time.sleep(poll)
+                found = cache.get_many([key, lock_key])
+                if key in found:
+                    status, value = 'coalesced', found[key]['value']
+                    break
+                if lock_key not in found:
+                    # Пересчёт закончился без записи (404, не 200):
+                    # ждать нечего, считаем сами
+                    status, value = 'miss', compute()
+                    break
+            else:
+                value = compute()
+    record_status(cache, status)
+    return value, status
+
+
+class PageCacheMixin:
+    """Отдаёт анонимным пользователям страницу из кэша.
+
+    Авторизованным пользователям страницы отличаются (свои посты,
+    формы, ссылки редактирования), поэтому для них кэш не используется.
+    cache_groups – группы сброса страницы, шаблоны по kwargs вьюхи.
+    """
+
+    cache_groups = ()
+
+    def get_cache_groups(self):
+        return [ALL] + [
+            group.format(**self.kwargs) for group in self.cache_groups
+        ]
+
+    def dispatch(self, request, *args, **kwargs):
+        timeout = get_page_cache_timeout()
+        if (
+            not timeout
+            or request.method not in ('GET', 'HEAD')
+            or request.user.is_authenticated
+        ):
+            return super().dispatch(request, *args, **kwargs)
+        rendered = None
+
+        def compute():
+            nonlocal rendered
+            rendered = super(PageCacheMixin, self).dispatch(
+                request, *args, **kwargs
+            )
+            if rendered.status_code != 200 or rendered.streaming:
+                return None
+            if not getattr(rendered, 'is_rendered', True):
+                rendered.render()
+            return {
+                'content': rendered.content,
+                'content_type': rendered['Content-Type'],
+            }
+
+        cached, status = single_flight(
+            get_page_cache(),
+            page_cache_key(
+                request.get_full_path(),
+                get_generations(self.get_cache_groups()),
+            ),
+            compute,
+            timeout,
+        )
+        if rendered is not None:
+            response = rendered
+        else:
+            response = HttpResponse(
+                cached['content'], content_type=cached['content_type']
+            )
+        response['X-Page-Cache'] = status
+        return response
+
+
+def get_card_cache_timeout():
+    """Время жизни карточки поста в кэше, 0 – кэш выключен"""
+    return getattr(settings, 'POST_CARD_CACHE_TIMEOUT', 0)
+
+
+def attach_card_versions(posts, generations=None):
+    """Проставляет постам версию кэша карточки post.card_version.
+
+    Версия складывается из поколений поста, автора, категории и локации,
+    поэтому снятие категории с публикации меняет одно поколение, а не
+    перебирает карточки. Поколения всех постов читаются одним запросом,
+    уже известные можно передать в generations.
+    """
+    posts = list(posts)
+    keys = {
+        post.pk: (
+            ALL, f'post:{post.pk}', f'author:{post.author_id}',
+            f'cat:{post.category_id}', f'loc:{post.location_id}',
+        )
+        for post in posts
+    }
+    generations = dict(generations or {})
+    groups = sorted({
+        group for key in keys.values() for group in key
+        if group not in generations
+    })
+    generations.update(zip(groups, get_generations(groups)))
+    eager = getattr(settings, 'POST_IMAGE_EAGER', 2)
+    for index, post in enumerate(posts, 1):
+        # Картинки первых карточек грузятся сразу, остальных лениво
+        loading = 'lazy' if index > eager else 'eager'
+        post.card_version = '.'.join(
+            generations[group] for group in keys[post.pk]
+        ) + f':{loading}'
+    return posts
@@ -0,0 +1,62 @@
+"""Пагинаторы для больших таблиц"""
+
+from django.core.paginator import Paginator
+from django.db import DatabaseError, connections, router
+from django.utils.functional import cached_property
+
+# Запросы для получения оценки числа строк из статистики СУБД
+ESTIMATE_QUERIES = {
+    'postgresql': (
+        'SELECT reltuples::bigint FROM pg_class WHERE relname = %s'
+    ),
+    'mysql': (
+        'SELECT table_rows FROM information_schema.tables '
+        'WHERE table_schema = DATABASE() AND table_name = %s'
+    ),
+    'sqlite': 'SELECT stat FROM sqlite_stat1 WHERE tbl = %s LIMIT 1',
+}
+
+
+def estimate_row_count(model):
+    """Приблизительное число строк в таблице модели.
+
+    Берётся из статистики планировщика (для SQLite она появляется
+    после ANALYZE). Если оценить не удалось, возвращает None.
+    """
+    connection = connections[router.db_for_read(model)]
+    sql = ESTIMATE_QUERIES.get(connection.vendor)
+    if sql is None:
+        return None
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute(sql, [model._meta.db_table])
+            row = cursor.fetchone()
+    except DatabaseError:
+        return None
+    if not row or row[0] is None:
+        return None
+    # В sqlite_stat1 первое число в колонке stat – количество строк
+    estimate = int(str(row[0]).split()[0])
+    return estimate if estimate > 0 else None
+
+
+class EstimatedCountPaginator(Paginator):
+    """Пагинатор, который не делает COUNT(*) по всей таблице.
+
+    Для запросов без фильтров число объектов берётся из статистики СУБД,
+    если таблица достаточно большая. Отфильтрованные запросы и маленькие
+    таблицы считаются как обычно.
+    """
+
+    # Ниже этого порога точный COUNT дешёвый, считаем честно
+    exact_count_threshold = 10000
+
+    @cached_property
+    def count(self):
+        query = getattr(self.object_list, 'query', None)
+        if query is None or query.where:
+            return super().count
+        estimate = estimate_row_count(self.object_list.model)
+        if estimate is None or estimate < self.exact_count_threshold:
+            return super().count
+        return estimate
@@ -1,30 +1,161 @@
 """Функция для получения постов"""
 
-from django.db.models import Count
+import base64
+from datetime import datetime
 
+from django.db.models import Count, Q
 from django.utils import timezone
 
 from blog.models import Post
+from . import lookups
+
+CATEGORY_FIELD = Post._meta.get_field('category')
+LOCATION_FIELD = Post._meta.get_field('location')
+
+
+def hydrate_relations(posts):
+    """Подставляет постам категории и локации из кэша процесса.
+
+    Для постов из get_model_queryset(cached_relations=True), вызывается
+    на уже выбранной странице. Возвращает прочитанные поколения групп
+    справочников, их можно передать в attach_card_versions.
+    """
+    pending = [
+        post for post in posts
+        if not CATEGORY_FIELD.is_cached(post)
+        or not LOCATION_FIELD.is_cached(post)
+    ]
+    category_ids = {post.category_id for post in pending} - {None}
+    location_ids = {post.location_id for post in pending} - {None}
+    generations = lookups.get_lookup_generations(category_ids, location_ids)
+    categories = lookups.get_categories(category_ids, generations)
+    locations = lookups.get_locations(location_ids, generations)
+    for post in pending:
+        for field, objects, pk in (
+            (CATEGORY_FIELD, categories, post.category_id),
+            (LOCATION_FIELD, locations, post.location_id),
+        ):
+            # Чего нет в кэше, загрузится при обращении, как обычно
+            if not field.is_cached(post) and (pk is None or pk in objects):
+                field.set_cached_value(post, objects.get(pk))
+    return generations
 
 
 def get_model_queryset(
         model_manager=Post.objects,
         add_filters=True,
-        add_annotation=False):
-    """Функция для получения нужных постов"""
-    queryset = model_manager.select_related(
-        'category',
-        'location',
-        'author',
-    ).order_by('-pub_date')
+        add_annotation=False,
+        cached_relations=False):
+    """Функция для получения нужных постов.
+
+    cached_relations – не присоединять категории и локации, после
+    выборки их подставляет из кэша процесса hydrate_relations.
+    """
+    if cached_relations:
+        queryset = model_manager.select_related('author')
+    else:
+        queryset = model_manager.select_related(
+            'category',
+            'location',
+            'author',
+        )
+    queryset = queryset.order_by('-pub_date')
     if add_filters:
         queryset = queryset.filter(
             is_published=True,
-            category__is_published=True,
             pub_date__lte=timezone.now(),
         )
+        if cached_relations:
+            queryset = queryset.filter(
+                category_id__in=lookups.get_published_category_ids()
+            )
+        else:
+            queryset = queryset.filter(category__is_published=True)
     if add_annotation:
         queryset = queryset.annotate(
             comment_count=Count('comments')
         )
     return queryset
+
+
+def get_visible_posts(user, add_annotation=False):
+    """Посты, которые пользователь может видеть.
+
+    Опубликованные посты всех авторов и все собственные посты.
+    """
+    queryset = get_model_queryset()
+    if user.is_authenticated:
+        queryset |= get_model_queryset(
+            model_manager=user.posts,
+            add_filters=False,
+        )
+    if add_annotation:
+        queryset = queryset.annotate(comment_count=Count('comments'))
+    return queryset
+
+
+def is_post_visible(post, user):
+    """Виден ли пост пользователю.
+
+    Автору показываем все его посты,
+    другим пользователям только опубликованные.
+    """
+    if user == post.author:
+        return True
+    return (
+        post.is_published
+        and post.pub_date <= timezone.now()
+        and post.category is not None
+        and post.category.is_published
+    )
+
+
+def make_cursor(date, pk):
+    """Кодируем позицию в ленте в непрозрачную строку для URL"""
+    raw = f'{date.isoformat()}|{pk}'.encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+
+def parse_cursor(cursor):
+    """Разбираем курсор из make_cursor, ValueError для мусора"""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+        date, pk = raw.decode().split('|')
+        return datetime.fromisoformat(date), int(pk)
+    except (TypeError, ValueError) as error:
+        raise ValueError(f'Некорректный курсор: {cursor}') from error
+
+
+def _get_value(item, name):
+    # Работаем и с объектами моделей, и со словарями из .values()
+    if isinstance(item, dict):
+        return item[name]
+    return getattr(item, name)
+
+
+def keyset_paginate(queryset, ordering, cursor=None, limit=10):
+    """Пагинация по ключу вместо OFFSET.
+
+    ordering – пара полей (дата, id) с одинаковым направлением,
+    например ('created_at', 'id') или ('-pub_date', '-id').
+    Возвращает список объектов страницы и курсор следующей страницы
+    (None, если страница последняя).
+    """
+    date_field, pk_field = (name.lstrip('-') for name in ordering)
+    lookup = 'lt' if ordering[0].startswith('-') else 'gt'
+    if cursor:
+        date, pk = parse_cursor(cursor)
+        queryset = queryset.filter(
+            Q(**{f'{date_field}__{lookup}': date})
+            | Q(**{date_field: date, f'{pk_field}__{lookup}': pk})
+        )
+    # Берём на один объект больше, чтобы узнать, есть ли следующая страница
+    items = list(queryset.order_by(*ordering)[:limit + 1])
+    next_cursor = None
+    if len(items) > limit:
+        items = items[:limit]
+        last = items[-1]
+        next_cursor = make_cursor(
+            _get_value(last, date_field), _get_value(last, pk_field)
+        )
+    return items, next_cursor
@@ -0,0 +1,157 @@
+"""Обработчики сигналов моделей блога"""
+
+from django.contrib.auth import get_user_model
+from django.db.models import F
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+from django.utils import timezone
+
+from blog.models import Category, Comments, ImageBlob, Location, Post
+from .images import describe_image
+from . import lookups
+from .invalidation import (
+    groups_purged, invalidate, invalidate_all, post_groups
+)
+
+User = get_user_model()
+
+
+def change_image_refs(name, delta):
+    if not name:
+        return
+    if delta > 0:
+        # get_or_create переживает одновременное создание той же записи,
+        # сам счётчик меняем только атомарным update
+        ImageBlob.objects.get_or_create(name=name)
+    blobs = ImageBlob.objects.filter(name=name)
+    if delta < 0:
+        blobs = blobs.filter(ref_count__gte=-delta)
+    blobs.update(
+        ref_count=F('ref_count') + delta, updated_at=timezone.now()
+    )
+
+
+@receiver(pre_save, sender=Post)
+def remember_old_values(sender, instance, raw, **kwargs):
+    instance._old_image = None
+    instance._old_values = None
+    if instance.pk and not raw:
+        instance._old_values = sender.objects.filter(pk=instance.pk).values(
+            'id', 'image', 'category__slug', 'author__username'
+        ).first()
+        if instance._old_values:
+            instance._old_image = instance._old_values['image']
+
+
+@receiver(post_save, sender=Post)
+def count_image_refs(sender, instance, created, raw, **kwargs):
+    if raw:
+        return
+    old, new = getattr(instance, '_old_image', None), instance.image.name
+    if old != new:
+        change_image_refs(new, 1)
+        change_image_refs(old, -1)
+        # Ресайз слишком долгий для запроса, копии строит
+        # backfill_image_metadata --renditions по расписанию
+        instance.image_meta = describe_image(instance.image, renditions=False)
+        sender.objects.filter(pk=instance.pk).update(
+            image_meta=instance.image_meta
+        )
+
+
+@receiver(post_delete, sender=Post)
+def release_image(sender, instance, **kwargs):
+    change_image_refs(instance.image.name, -1)
+
+
+def describe_post(post):
+    return {
+        'id': post.pk,
+        'category__slug': post.category.slug if post.category_id else None,
+        'author__username': post.author.username,
+    }
+
+
+@receiver(post_save, sender=Post)
+def invalidate_saved_post(sender, instance, raw, **kwargs):
+    if raw:
+        # loaddata: связанные объекты могут быть ещё не загружены
+        invalidate_all()
+        return
+    # Пост мог сменить категорию, сбрасываем и старую
+    posts = [describe_post(instance)]
+    if getattr(instance, '_old_values', None):
+        posts.append(instance._old_values)
+    invalidate(*post_groups(*posts))
+
+
+@receiver(post_delete, sender=Post)
+def invalidate_deleted_post(sender, instance, **kwargs):
+    invalidate(*post_groups(describe_post(instance)))
+
+
+@receiver(post_save, sender=Comments)
+@receiver(post_delete, sender=Comments)
+def invalidate_comment_post(sender, instance, **kwargs):
+    # Число комментариев видно в карточке поста на всех лентах
+    invalidate(*post_groups(*Post.objects.filter(
+        pk=instance.post_id
+    ).values('id', 'category__slug', 'author__username')))
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+def invalidate_category(sender, instance, **kwargs):
+    # Свой процесс не ждёт коммита, чтобы не отдать старую категорию
+    lookups.forget_category(instance.pk)
+    # Карточки постов категории сбрасываются поколением cat:<id>,
+    # страницы лент и постов – своими общими группами
+    invalidate(
+        f'cat:{instance.pk}', f'category:{instance.slug}', 'categories',
+        'feeds', 'details',
+    )
+
+
+@receiver(post_save, sender=Location)
+@receiver(post_delete, sender=Location)
+def invalidate_location(sender, instance, **kwargs):
+    lookups.forget_location(instance.pk)
+    invalidate(f'loc:{instance.pk}', 'feeds', 'details')
+
+
+def is_login_only(update_fields):
+    # Вход пользователя обновляет только last_login, страниц это не меняет
+    return bool(update_fields) and set(update_fields) <= {'last_login'}
+
+
+@receiver(pre_save, sender=User)
+def remember_old_username(sender, instance, raw, update_fields=None,
+                          **kwargs):
+    instance._old_username = None
+    if instance.pk and not raw and not is_login_only(update_fields):
+        instance._old_username = sender.objects.filter(
+            pk=instance.pk
+        ).values_list('username', flat=True).first()
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def invalidate_user(sender, instance, created=False, update_fields=None,
+                    **kwargs):
+    # Нового пользователя ещё нет ни на одной странице
+    if created or is_login_only(update_fields):
+        return
+    # Имя автора видно в его профиле, в карточках и на страницах постов
+    groups = {
+        f'profile:{instance.username}', f'author:{instance.pk}',
+        'feeds', 'details',
+    }
+    old_username = getattr(instance, '_old_username', None)
+    if old_username:
+        groups.add(f'profile:{old_username}')
+    invalidate(*groups)
+
+
+@receiver(groups_purged)
+def forget_lookups(sender, groups, **kwargs):
+    lookups.forget_groups(groups)
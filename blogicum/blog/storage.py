@@ -0,0 +1,65 @@
+"""Хранилище картинок постов с дедупликацией по содержимому"""
+
+import hashlib
+import os
+
+from django.core.files.storage import FileSystemStorage
+from django.utils.deconstruct import deconstructible
+
+HASH_CHUNK_SIZE = 64 * 1024
+
+
+def content_hash(content):
+    digest = hashlib.sha256()
+    content.seek(0)
+    for chunk in content.chunks(HASH_CHUNK_SIZE):
+        digest.update(chunk)
+    content.seek(0)
+    return digest.hexdigest()
+
+
+@deconstructible
+class ContentAddressedStorage(FileSystemStorage):
+    """Сохраняет файл под именем из хеша его содержимого.
+
+    Одинаковые загрузки хранятся одним файлом. Файлы раскладываются
+    по подкаталогам из первых символов хеша, чтобы в одном каталоге
+    не копились десятки тысяч файлов: posts_images/ab/cd/abcd….jpg.
+    """
+
+    def blob_name(self, name, digest):
+        directory, filename = os.path.split(name)
+        extension = os.path.splitext(filename)[1].lower()
+        return os.path.join(
+            directory, digest[:2], digest[2:4], digest + extension
+        ).replace(os.sep, '/')
+
+    def save(self, name, content, max_length=None):
+        if name is None:
+            name = content.name
+        return self.save_exact(
+            self.blob_name(name, content_hash(content)), content, max_length
+        )
+
+    def save_exact(self, name, content, max_length=None):
+        """Сохраняет файл под заданным именем, если его ещё нет"""
+        try:
+            # Файл уже есть: обновляем время изменения, чтобы gc_media
+            # не счёл его старым, пока сохраняется ссылающийся пост
+            os.utime(self.path(name))
+        except FileNotFoundError:
+            pass
+        else:
+            return name
+        try:
+            return super().save(name, content, max_length=max_length)
+        except FileExistsError:
+            # Тот же файл успел сохранить другой процесс
+            return name
+
+    def get_available_name(self, name, max_length=None):
+        # Файл с тем же именем – это файл с тем же содержимым,
+        # вместо подбора нового имени прерываем сохранение
+        if self.exists(name):
+            raise FileExistsError(name)
+        return name
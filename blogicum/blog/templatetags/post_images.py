@@ -0,0 +1,47 @@
+from django import template
+from django.conf import settings
+from django.utils.html import format_html
+
+register = template.Library()
+
+IMAGE_CLASS = 'border-3 rounded img-fluid img-thumbnail mb-2 mx-auto d-block'
+# Ширина карточки поста 40rem
+IMAGE_SIZES = '(max-width: 640px) 100vw, 640px'
+
+
+@register.simple_tag
+def post_image(post, index=1, css_class=IMAGE_CLASS):
+    """<img> картинки поста с srcset из Post.image_meta.
+
+    Размеры и адреса копий берутся из сохранённых метаданных,
+    к файлам при отрисовке не обращаемся. Картинки карточек
+    ниже первых POST_IMAGE_EAGER загружаются лениво.
+    """
+    meta = post.image_meta
+    renditions = meta.get('renditions')
+    if not renditions:
+        if 'width' in meta:
+            return format_html(
+                '<img class="{}" src="{}" width="{}" height="{}">',
+                css_class, post.image.url, meta['width'], meta['height'],
+            )
+        return format_html(
+            '<img class="{}" src="{}">', css_class, post.image.url
+        )
+    storage = post.image.storage
+    original = renditions[-1]
+    srcset = ', '.join(
+        f'{storage.url(rendition["name"])} {rendition["width"]}w'
+        for rendition in renditions
+    )
+    # Вне цикла forloop.counter пустой – считаем картинку первой
+    loading = (
+        'lazy' if index and index > getattr(settings, 'POST_IMAGE_EAGER', 2)
+        else 'eager'
+    )
+    return format_html(
+        '<img class="{}" src="{}" srcset="{}" sizes="{}" width="{}" '
+        'height="{}" loading="{}" decoding="async">',
+        css_class, storage.url(original['name']), srcset, IMAGE_SIZES,
+        original['width'], original['height'], loading,
+    )
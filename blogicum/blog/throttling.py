@@ -0,0 +1,159 @@
+"""Ограничение частоты отправки постов и комментариев"""
+
+import math
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db.models import F
+from django.shortcuts import render
+from django.utils import timezone
+
+THROTTLE_PREFIX = 'blog:throttle'
+RATE_PERIODS = {'s': 1, 'm': 60, 'h': 3600, 'd': 86400}
+# Сколько хранить в кэше ещё не перенесённые в базу отказы
+REJECTED_TIMEOUT = 86400
+
+
+def parse_rate(rate):
+    """'10/m' -> (10, 60): лимит запросов и длина окна в секундах"""
+    count, period = rate.split('/')
+    return int(count), RATE_PERIODS[period[0]]
+
+
+def get_client_ip(request):
+    # За прокси REMOTE_ADDR должен выставлять сам прокси
+    return request.META.get('REMOTE_ADDR', '')
+
+
+def get_throttle_cache():
+    return caches[getattr(settings, 'BLOG_RATE_LIMIT_CACHE', 'default')]
+
+
+def incr(cache, key, timeout):
+    """Атомарно увеличивает счётчик, создавая его при отсутствии"""
+    if cache.add(key, 1, timeout):
+        return 1
+    try:
+        return cache.incr(key)
+    except ValueError:
+        # Ключ вытеснили между add и incr
+        cache.add(key, 1, timeout)
+        return 1
+
+
+def sliding_window_wait(cache, prefix, rate, now):
+    """Учитывает запрос в скользящем окне.
+
+    К счётчику текущего окна добавляется счётчик предыдущего с весом,
+    равным доле, на которую скользящее окно его ещё перекрывает.
+    Возвращает ключ счётчика и 0 или сколько секунд ждать.
+    """
+    count, period = parse_rate(rate)
+    window = int(now // period)
+    key = f'{prefix}:{window}'
+    # Счётчик живёт два окна, чтобы следующее окно его видело
+    current = incr(cache, key, 2 * period)
+    previous = cache.get(f'{prefix}:{window - 1}', 0)
+    elapsed = now - window * period
+    if previous * (1 - elapsed / period) + current <= count:
+        return key, 0
+    if current > count:
+        # Текущее окно исчерпано само по себе
+        return key, period - elapsed
+    # Ждём, пока вес предыдущего окна не опустится до лимита
+    return key, period * (1 - (count - current) / previous) - elapsed
+
+
+def take_token(scope, request):
+    """Учитывает запрос в окнах пользователя и IP.
+
+    Лимит count запросов за period секунд считается скользящим окном,
+    поэтому на стыке окон не проходит двойной лимит. Счётчики
+    увеличиваются атомарно, и одновременные запросы не проскакивают
+    лимит. Запрос проходит, только если лимит не превышен в обоих
+    окнах, отклонённый запрос лимит не расходует.
+    Возвращает 0 или сколько секунд ждать.
+    """
+    limits = getattr(settings, 'BLOG_RATE_LIMITS', {}).get(scope)
+    if not limits:
+        return 0
+    idents = {'ip': get_client_ip(request)}
+    if request.user.is_authenticated:
+        idents['user'] = request.user.pk
+    cache = get_throttle_cache()
+    now = time.time()
+    keys, waits = [], [0]
+    for kind, rate in limits.items():
+        if kind in idents:
+            prefix = f'{THROTTLE_PREFIX}:{scope}:{kind}:{idents[kind]}'
+            key, wait = sliding_window_wait(cache, prefix, rate, now)
+            keys.append(key)
+            waits.append(wait)
+    wait = max(waits)
+    if wait:
+        for key in keys:
+            try:
+                cache.decr(key)
+            except ValueError:
+                pass
+    return wait
+
+
+def record_throttled(scope, request):
+    """Счётчик отклонённых запросов для админки.
+
+    Отказы считаются в кэше, а в базу переносятся не чаще раза
+    в BLOG_RATE_LIMIT_FLUSH_INTERVAL секунд на клиента, чтобы
+    поток отклонённых запросов не нагружал базу записями.
+    """
+    from blog.models import ThrottledRequest
+
+    key = (
+        f'user:{request.user.username}' if request.user.is_authenticated
+        else f'ip:{get_client_ip(request)}'
+    )
+    cache = get_throttle_cache()
+    counter = f'{THROTTLE_PREFIX}:rejected:{scope}:{key}'
+    incr(cache, counter, REJECTED_TIMEOUT)
+    interval = getattr(settings, 'BLOG_RATE_LIMIT_FLUSH_INTERVAL', 60)
+    if not cache.add(f'{counter}:flushed', 1, interval):
+        return
+    pending = cache.get(counter, 0)
+    if not pending:
+        return
+    try:
+        # decr, а не delete: отказы, учтённые параллельно, не теряются
+        cache.decr(counter, pending)
+    except ValueError:
+        return
+    now = timezone.now()
+    updated = ThrottledRequest.objects.filter(scope=scope, key=key).update(
+        count=F('count') + pending, last_at=now
+    )
+    if not updated:
+        ThrottledRequest.objects.get_or_create(
+            scope=scope, key=key, defaults={'count': pending, 'last_at': now}
+        )
+
+
+class RateLimitMixin:
+    """Ограничивает частоту POST-запросов к вьюхе.
+
+    Лимиты задаются в BLOG_RATE_LIMITS по rate_limit_scope.
+    """
+
+    rate_limit_scope = None
+
+    def dispatch(self, request, *args, **kwargs):
+        if request.method == 'POST' and self.rate_limit_scope:
+            wait = take_token(self.rate_limit_scope, request)
+            if wait:
+                record_throttled(self.rate_limit_scope, request)
+                response = render(
+                    request, 'pages/429.html', {'retry_after': wait},
+                    status=429,
+                )
+                response['Retry-After'] = math.ceil(wait)
+                return response
+        return super().dispatch(request, *args, **kwargs)
@@ -0,0 +1,102 @@
+"""Проверка загружаемых картинок во время приёма файла"""
+
+from io import BytesIO
+
+from django.conf import settings
+from django.core.files.uploadhandler import FileUploadHandler, SkipFile
+from PIL import Image
+
+# Сколько байт от начала файла читать в поисках размеров картинки
+HEADER_LIMIT = 256 * 1024
+
+
+def get_image_limits():
+    return (
+        getattr(settings, 'POST_IMAGE_MAX_SIZE', 5 * 2**20),
+        getattr(settings, 'POST_IMAGE_MAX_SIDE', 10000),
+        getattr(settings, 'POST_IMAGE_MAX_PIXELS', 40_000_000),
+    )
+
+
+def too_many_pixels_message():
+    _, _, max_pixels = get_image_limits()
+    return (
+        'Изображение должно быть не больше '
+        f'{max_pixels / 1_000_000:g} мегапикселей.'
+    )
+
+
+def check_dimensions(width, height):
+    """Текст ошибки, если картинка слишком большая, иначе None"""
+    _, max_side, max_pixels = get_image_limits()
+    if width > max_side or height > max_side:
+        return f'Стороны изображения должны быть не больше {max_side} px.'
+    if width * height > max_pixels:
+        return too_many_pixels_message()
+    return None
+
+
+def read_image_size(header):
+    """Размеры картинки по началу файла.
+
+    Image.open читает только заголовок и не распаковывает пиксели.
+    Возвращает None, если данных пока недостаточно.
+    """
+    try:
+        with Image.open(BytesIO(header)) as image:
+            return image.size
+    except Image.DecompressionBombError:
+        raise
+    except Exception:
+        return None
+
+
+class ImageLimitUploadHandler(FileUploadHandler):
+    """Прерывает приём файла, как только он превысил лимиты.
+
+    Стоит в FILE_UPLOAD_HANDLERS первым и передаёт данные дальше.
+    Размер проверяется по мере приёма, размеры картинки – по
+    заголовку. Отброшенный файл не попадает в request.FILES,
+    а причина сохраняется в request.upload_errors, откуда её
+    показывают формы с ImageLimitFormMixin.
+    """
+
+    def new_file(self, *args, **kwargs):
+        super().new_file(*args, **kwargs)
+        self.received = 0
+        self.header = b''
+
+    def reject(self, message):
+        if not hasattr(self.request, 'upload_errors'):
+            self.request.upload_errors = {}
+        self.request.upload_errors[self.field_name] = message
+        raise SkipFile(message)
+
+    def receive_data_chunk(self, raw_data, start):
+        max_size, _, _ = get_image_limits()
+        self.received += len(raw_data)
+        if self.received > max_size:
+            self.reject(
+                f'Размер файла должен быть не больше {max_size // 2**20} МБ.'
+            )
+        if self.header is not None:
+            self.check_header(raw_data)
+        return raw_data
+
+    def check_header(self, raw_data):
+        self.header += raw_data
+        try:
+            size = read_image_size(self.header)
+        except Image.DecompressionBombError:
+            self.reject(too_many_pixels_message())
+        if size is not None:
+            self.header = None
+            message = check_dimensions(*size)
+            if message:
+                self.reject(message)
+        elif len(self.header) > HEADER_LIMIT:
+            # Не картинка или незнакомый формат – решит валидация формы
+            self.header = None
+
+    def file_complete(self, file_size):
+        return None
@@ -1,6 +1,6 @@
 from django.urls import path
 
-from . import views
+from . import api, async_views, views
 
 app_name = 'blog'
 
@@ -21,6 +21,16 @@ urlpatterns = [
         views.CommentDeleteView.as_view(),
         name='delete_comment',
     ),
+    path(
+        'posts/<int:post_id>/comments/',
+        views.CommentListView.as_view(),
+        name='comments',
+    ),
+    path(
+        'posts/<int:post_id>/comments/stream/',
+        views.CommentStreamView.as_view(),
+        name='comment_stream',
+    ),
     path(
         'posts/<int:post_id>/',
         views.PostDetailView.as_view(),
@@ -51,4 +61,47 @@ urlpatterns = [
         'profile/<str:username>/',
         views.UserDetailView.as_view(),
         name='profile'),
+    path('api/posts/', api.PostListApiView.as_view(), name='api_posts'),
+    path(
+        'api/posts/<int:post_id>/',
+        api.PostDetailApiView.as_view(),
+        name='api_post_detail',
+    ),
+    path(
+        'api/posts/<int:post_id>/comments/',
+        api.CommentListApiView.as_view(),
+        name='api_comments',
+    ),
+    path(
+        'api/category/<slug:category_slug>/',
+        api.CategoryPostsApiView.as_view(),
+        name='api_category_posts',
+    ),
+    path(
+        'api/profile/<str:username>/',
+        api.ProfilePostsApiView.as_view(),
+        name='api_profile',
+    ),
+    path(
+        'export/<str:kind>/',
+        views.ExportView.as_view(),
+        name='export',
+    ),
+    # Асинхронные версии страниц для работы под ASGI
+    path('async/', async_views.post_list, name='async_index'),
+    path(
+        'async/posts/<int:post_id>/',
+        async_views.post_detail,
+        name='async_post_detail',
+    ),
+    path(
+        'async/category/<slug:category_slug>/',
+        async_views.category_posts,
+        name='async_category_posts',
+    ),
+    path(
+        'async/profile/<str:username>/',
+        async_views.profile,
+        name='async_profile',
+    ),
 ]
@@ -1,65 +1,177 @@
+import json
+import time
+
 from django.conf import settings
 from django.contrib.auth import get_user_model
-from django.contrib.auth.mixins import LoginRequiredMixin
-from django.http import Http404
-from django.shortcuts import get_object_or_404, redirect
+from django.contrib.auth.mixins import LoginRequiredMixin, UserPassesTestMixin
+from django.core.exceptions import BadRequest
+from django.db import transaction
+from django.http import Http404, JsonResponse, StreamingHttpResponse
+from django.shortcuts import get_object_or_404, redirect, render
 from django.urls import reverse, reverse_lazy
-from django.utils import timezone
-
+from django.views import View
 from django.views.generic import (CreateView, DeleteView,
                                   DetailView, ListView, UpdateView)
 
 from blog.models import Category, Post
+from .events import (get_backend, post_channel, publish_comment,
+                     serialize_comment)
+from .export_utils import (EXPORT_FIELDS, get_export_queryset,
+                           iter_gzip, iter_ndjson)
 from .forms import CommentForm, PostForm
-from .query_utils import get_model_queryset
+from .lookups import get_category_by_slug, lookup_cache_enabled
+from .page_cache import PageCacheMixin
+from .query_utils import get_model_queryset, keyset_paginate
+from .throttling import RateLimitMixin
 from .views_mixins import (CommentMixin, OnlyAuthorMixin,
                            OnlyAuthorCommentMixin,
-                           PostMixin, PostListMixin)
+                           PostFormMixin, PostMixin, PostListMixin,
+                           VisiblePostMixin)
 
 
 # Импортируем число постов на странице из настроек проекта
 paginate_by = getattr(settings, 'PAGINATE_BY', 10)
+# Число комментариев, загружаемых за один раз
+comments_paginate_by = getattr(settings, 'COMMENTS_PAGINATE_BY', 20)
+# Сколько секунд держим SSE-соединение, после чего клиент переподключится
+sse_max_duration = getattr(settings, 'SSE_MAX_DURATION', 300)
+# Интервал пустых сообщений, чтобы прокси не закрывали соединение
+sse_keepalive = getattr(settings, 'SSE_KEEPALIVE', 15)
 User = get_user_model()
 
 
-class PostDetailView(PostMixin, DetailView):
+def get_comments_page(post, cursor=None):
+    """Страница комментариев поста, начиная с позиции cursor"""
+    return keyset_paginate(
+        # Дополнительно подгружаем авторов комментариев,
+        # чтобы избежать множества запросов к БД.
+        post.comments.select_related('author'),
+        ordering=('created_at', 'id'),
+        cursor=cursor,
+        limit=comments_paginate_by,
+    )
+
+
+class PostDetailView(
+        PageCacheMixin, PostMixin, VisiblePostMixin, DetailView):
     """Просмотр поста"""
 
+    cache_groups = ('details', 'post:{post_id}')
+
     # Автору показываем все его посты
     # другим пользователям только опубликованные
     def get_object(self):
-        queryset = super().get_object()
-        post = get_object_or_404(Post, pk=self.kwargs.get('post_id'))
-        # Если пользователь – автор поста, то показываем ему пост
-        # в любом случае
-        # Если пользователь не автор, то фильтруем посты и
-        # проверяем опубликован ли пост и категория
-        if (
-            self.request.user != post.author and (
-                not post.is_published
-                or post.pub_date > timezone.now()
-                or not post.category.is_published
-            )
-        ):
-            raise Http404
-        return queryset
+        return self.get_post()
 
-    # Добавляем комментарии к посту
+    # Добавляем первую страницу комментариев к посту,
+    # остальные подгружаются через CommentListView
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         context['form'] = CommentForm()
-        context['comments'] = (
-            # Дополнительно подгружаем авторов комментариев,
-            # чтобы избежать множества запросов к БД.
-            self.object.comments.select_related('author')
-        )
+        comments, next_cursor = get_comments_page(self.object)
+        context['comments'] = comments
+        context['comments_next_cursor'] = next_cursor
+        context['comment_count'] = self.object.comments.count()
         return context
 
 
-class PostCreateView(PostMixin, LoginRequiredMixin, CreateView):
+class CommentListView(VisiblePostMixin, View):
+    """Следующие страницы комментариев поста.
+
+    По умолчанию отдаёт HTML-фрагмент для подгрузки на странице поста,
+    с параметром format=json – список комментариев в JSON.
+    """
+
+    def get(self, request, *args, **kwargs):
+        post = self.get_post()
+        try:
+            comments, next_cursor = get_comments_page(
+                post, cursor=request.GET.get('after')
+            )
+        except ValueError:
+            raise BadRequest('Некорректный параметр after')
+        if request.GET.get('format') == 'json':
+            return JsonResponse({
+                'results': [
+                    {
+                        'id': comment.id,
+                        'author': comment.author.username,
+                        'text': comment.text,
+                        'created_at': comment.created_at,
+                    }
+                    for comment in comments
+                ],
+                'next': next_cursor,
+            })
+        return render(request, 'includes/comment_items.html', {
+            'post': post,
+            'comments': comments,
+            'comments_next_cursor': next_cursor,
+        })
+
+
+def format_sse(data, event=None, event_id=None):
+    """Одно сообщение в формате text/event-stream"""
+    lines = []
+    if event_id is not None:
+        lines.append(f'id: {event_id}')
+    if event:
+        lines.append(f'event: {event}')
+    lines.append(f'data: {json.dumps(data, ensure_ascii=False)}')
+    return '\n'.join(lines) + '\n\n'
+
+
+class CommentStreamView(VisiblePostMixin, View):
+    """Поток новых комментариев к посту (server-sent events).
+
+    При переподключении с заголовком Last-Event-ID сначала отдаём
+    комментарии, пропущенные за время разрыва.
+    """
+
+    def get(self, request, *args, **kwargs):
+        post = self.get_post()
+        # Подписываемся сразу, чтобы не потерять события до первого чтения
+        subscription = get_backend().subscribe(post_channel(post.pk))
+        missed = []
+        last_id = request.headers.get('Last-Event-ID', '')
+        if last_id.isdigit():
+            missed = [
+                serialize_comment(comment)
+                for comment in post.comments.select_related('author').filter(
+                    pk__gt=int(last_id)
+                ).order_by('id')[:comments_paginate_by]
+            ]
+        response = StreamingHttpResponse(
+            self.stream(subscription, missed),
+            content_type='text/event-stream',
+        )
+        # Отписываемся при закрытии ответа: finally генератора не
+        # выполнится, если клиент ушёл до первого чтения
+        response._resource_closers.append(subscription.close)
+        response['Cache-Control'] = 'no-cache'
+        # Просим nginx не буферизовать поток
+        response['X-Accel-Buffering'] = 'no'
+        return response
+
+    def stream(self, subscription, missed):
+        # Через сколько миллисекунд переподключаться после разрыва
+        yield 'retry: 3000\n\n'
+        for comment in missed:
+            yield format_sse(comment, 'comment', comment['id'])
+        deadline = time.monotonic() + sse_max_duration
+        while time.monotonic() < deadline:
+            comment = subscription.get(timeout=sse_keepalive)
+            if comment is None:
+                yield ': keepalive\n\n'
+            else:
+                yield format_sse(comment, 'comment', comment['id'])
+
+
+class PostCreateView(
+        PostFormMixin, LoginRequiredMixin, RateLimitMixin, CreateView):
     """Создание новой публикации"""
 
-    form_class = PostForm
+    rate_limit_scope = 'post'
 
     def form_valid(self, form):
         form.instance.author = self.request.user
@@ -72,14 +184,14 @@ class PostCreateView(PostMixin, LoginRequiredMixin, CreateView):
         )
 
 
-class PostListView(PostListMixin, ListView):
+class PostListView(PageCacheMixin, PostListMixin, ListView):
     """Список постов"""
 
+    cache_groups = ('feeds', 'index')
 
-class PostUpdateView(PostMixin, UpdateView):
-    """Изменение существующей публикации"""
 
-    form_class = PostForm
+class PostUpdateView(PostFormMixin, UpdateView):
+    """Изменение существующей публикации"""
 
     def dispatch(self, request, *args, **kwargs):
         # Проверяем, имеет ли пользователь право на редактирование
@@ -111,15 +223,22 @@ class PostDeleteView(PostMixin, OnlyAuthorMixin, DeleteView):
         return reverse('blog:index',)
 
 
-class CommentCreateView(CommentMixin, LoginRequiredMixin, CreateView):
+class CommentCreateView(
+        CommentMixin, LoginRequiredMixin, RateLimitMixin, CreateView):
     """Создание комментариев"""
 
+    rate_limit_scope = 'comment'
+
     template_name = 'blog/comments.html'
 
     def form_valid(self, form):
         form.instance.author = self.request.user
         form.instance.post = get_object_or_404(Post, pk=self.kwargs['post_id'])
-        return super().form_valid(form)
+        response = super().form_valid(form)
+        # Сообщаем читателям поста о новом комментарии после коммита
+        comment = self.object
+        transaction.on_commit(lambda: publish_comment(comment))
+        return response
 
 
 class CommentDeleteView(CommentMixin, OnlyAuthorCommentMixin, DeleteView):
@@ -130,25 +249,33 @@ class CommentUpdateView(CommentMixin, OnlyAuthorCommentMixin, UpdateView):
     """Изменение комментария"""
 
 
-class CategoryListView(PostListMixin, ListView):
+class CategoryListView(PageCacheMixin, PostListMixin, ListView):
     """Просмотр категории постов"""
 
+    cache_groups = ('feeds', 'category:{category_slug}')
     slug_url_kwarg = 'category_slug'
     template_name = 'blog/category_list.html'
 
     def get_category(self):
         """Получаем категорию"""
-        category = get_object_or_404(
-            Category,
-            slug=self.kwargs['category_slug'],
-            is_published=True,
-        )
+        if not lookup_cache_enabled():
+            return get_object_or_404(
+                Category,
+                slug=self.kwargs['category_slug'],
+                is_published=True,
+            )
+        category = get_category_by_slug(self.kwargs['category_slug'])
+        if category is None or not category.is_published:
+            raise Http404
         return category
 
     def get_queryset(self):
         """Фильтруем посты по категории."""
         category = self.get_category()
-        return get_model_queryset(model_manager=category.posts)
+        return get_model_queryset(
+            model_manager=category.posts,
+            cached_relations=lookup_cache_enabled(),
+        )
 
     def get_context_data(self, **kwargs):
         """Добавляем категорию в контекст"""
@@ -157,9 +284,10 @@ class CategoryListView(PostListMixin, ListView):
         return context
 
 
-class UserDetailView(PostListMixin, ListView):
+class UserDetailView(PageCacheMixin, PostListMixin, ListView):
     """Просмотр информации о пользователе"""
 
+    cache_groups = ('feeds', 'profile:{username}')
     template_name = 'blog/profile.html'
     paginate_by = paginate_by
     slug_url_kwarg = 'username'
@@ -185,6 +313,7 @@ class UserDetailView(PostListMixin, ListView):
                 model_manager=author.posts,
                 add_filters=False,
                 add_annotation=True,
+                cached_relations=lookup_cache_enabled(),
             )
         # Если пользователь не является автором
         # то показываем ему только опубликованные посты
@@ -193,6 +322,7 @@ class UserDetailView(PostListMixin, ListView):
                 model_manager=author.posts,
                 add_filters=True,
                 add_annotation=True,
+                cached_relations=lookup_cache_enabled(),
             )
         return queryset
 
@@ -220,3 +350,38 @@ class UserUpdateView(LoginRequiredMixin, UpdateView):
             'blog:profile',
             kwargs={'username': self.object.username}
         )
+
+
+class ExportView(UserPassesTestMixin, View):
+    """Потоковая выгрузка постов или комментариев в NDJSON для админов.
+
+    Фильтры: category, author, since, until; gzip=1 сжимает выгрузку.
+    """
+
+    def test_func(self):
+        return self.request.user.is_staff
+
+    def get(self, request, *args, **kwargs):
+        kind = self.kwargs['kind']
+        if kind not in EXPORT_FIELDS:
+            raise Http404
+        try:
+            queryset = get_export_queryset(
+                kind,
+                category=request.GET.get('category'),
+                author=request.GET.get('author'),
+                since=request.GET.get('since'),
+                until=request.GET.get('until'),
+            )
+        except ValueError as error:
+            raise BadRequest(error)
+        chunks = iter_ndjson(queryset, kind)
+        filename = f'{kind}.ndjson'
+        content_type = 'application/x-ndjson'
+        if request.GET.get('gzip'):
+            chunks = iter_gzip(chunks)
+            filename += '.gz'
+            content_type = 'application/gzip'
+        response = StreamingHttpResponse(chunks, content_type=content_type)
+        response['Content-Disposition'] = f'attachment; filename="{filename}"'
+        return response
@@ -1,10 +1,14 @@
 from django.contrib.auth.mixins import UserPassesTestMixin
+from django.http import Http404
 from django.shortcuts import get_object_or_404
 from django.urls import reverse
 
 from blog.models import Post, Comments
-from .forms import CommentForm
-from .query_utils import get_model_queryset
+from .forms import CommentForm, PostForm
+from .lookups import lookup_cache_enabled
+from .page_cache import attach_card_versions, get_card_cache_timeout
+from .query_utils import (get_model_queryset, hydrate_relations,
+                          is_post_visible)
 
 
 class OnlyAuthorMixin(UserPassesTestMixin):
@@ -36,6 +40,30 @@ class PostMixin:
     pk_url_kwarg = 'post_id'
 
 
+class PostFormMixin(PostMixin):
+    """Миксин для формы поста"""
+
+    form_class = PostForm
+
+    def get_form_kwargs(self):
+        kwargs = super().get_form_kwargs()
+        kwargs['upload_errors'] = getattr(self.request, 'upload_errors', {})
+        return kwargs
+
+
+class VisiblePostMixin:
+    """Получаем пост с проверкой, виден ли он пользователю"""
+
+    def get_post(self):
+        post = get_object_or_404(
+            Post.objects.select_related('category', 'location', 'author'),
+            pk=self.kwargs.get('post_id'),
+        )
+        if not is_post_visible(post, self.request.user):
+            raise Http404
+        return post
+
+
 class PostListMixin(PostMixin):
     """Добавляем в миксине фильтры и связанные модели"""
 
@@ -45,8 +73,24 @@ class PostListMixin(PostMixin):
         return get_model_queryset(
             add_filters=True,
             add_annotation=True,
+            cached_relations=lookup_cache_enabled(),
         )
 
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        page = context.get('page_obj')
+        if not page:
+            return context
+        page.object_list = list(page.object_list)
+        generations = None
+        if lookup_cache_enabled():
+            generations = hydrate_relations(page.object_list)
+        timeout = get_card_cache_timeout()
+        if timeout:
+            attach_card_versions(page.object_list, generations)
+            context['post_card_timeout'] = timeout
+        return context
+
 
 class CommentMixin():
     """Миксин для комментариев"""
@@ -0,0 +1,25 @@
+"""Распределение моделей по базам данных"""
+
+SESSIONS_DB = 'sessions'
+
+
+class SessionRouter:
+    """Хранит сессии в отдельной базе 'sessions'.
+
+    Чтение и запись сессий на каждом запросе не блокируют
+    основную SQLite базу.
+    """
+
+    def db_for_read(self, model, **hints):
+        if model._meta.app_label == 'sessions':
+            return SESSIONS_DB
+        return None
+
+    db_for_write = db_for_read
+
+    def allow_migrate(self, db, app_label, **hints):
+        if app_label == 'sessions':
+            return db == SESSIONS_DB
+        if db == SESSIONS_DB:
+            return False
+        return None
@@ -0,0 +1,140 @@
+"""Раздача загруженных пользователями файлов"""
+
+import mimetypes
+import os
+import re
+from urllib.parse import quote
+
+from django.conf import settings
+from django.core.exceptions import SuspiciousFileOperation
+from django.core.files.storage import FileSystemStorage
+from django.http import (FileResponse, Http404, HttpResponse,
+                         HttpResponseNotAllowed)
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, parse_http_date_safe
+
+range_re = re.compile(r'^bytes=(\d*)-(\d*)$')
+# Файлы читаются блоками по 64 КБ вместо 4 КБ по умолчанию
+BLOCK_SIZE = 64 * 1024
+
+
+class FileRange:
+    """Часть открытого файла для FileResponse"""
+
+    def __init__(self, file, start, length):
+        self.file = file
+        self.file.seek(start)
+        self.remaining = length
+
+    def read(self, size=-1):
+        if size < 0 or size > self.remaining:
+            size = self.remaining
+        data = self.file.read(size)
+        self.remaining -= len(data)
+        return data
+
+    def close(self):
+        self.file.close()
+
+
+def parse_range(header, size):
+    """Границы запрошенного диапазона байт.
+
+    Поддерживается только один диапазон: для нескольких
+    и для некорректного заголовка возвращается None
+    и файл отдаётся целиком. Для диапазона за концом
+    файла возвращается пустой кортеж.
+    """
+    match = range_re.match(header.replace(' ', ''))
+    if not match or match.groups() == ('', ''):
+        return None
+    start, end = match.groups()
+    if start == '':
+        # bytes=-500 – последние 500 байт
+        start, end = max(size - int(end), 0), size - 1
+    else:
+        start = int(start)
+        end = min(int(end), size - 1) if end else size - 1
+    if start > end or start >= size:
+        return ()
+    return start, end
+
+
+def if_range_matches(request, etag, mtime):
+    value = request.META.get('HTTP_IF_RANGE')
+    if value is None:
+        return True
+    if value.startswith(('"', 'W/')):
+        return value == etag
+    modified = parse_http_date_safe(value)
+    return modified is not None and int(mtime) <= modified
+
+
+def offload(path, content_type):
+    """Передаёт отдачу файла веб-серверу, если он это умеет"""
+    header = getattr(settings, 'MEDIA_SENDFILE_HEADER', None)
+    if not header:
+        return None
+    response = HttpResponse(content_type=content_type)
+    if header == 'X-Accel-Redirect':
+        # nginx отдаёт файл из internal location с этим префиксом
+        relative = os.path.relpath(path, settings.MEDIA_ROOT)
+        # Старые файлы могут называться не латиницей, nginx ждёт URL
+        response[header] = quote(
+            settings.MEDIA_SENDFILE_URL + relative.replace(os.sep, '/')
+        )
+    else:
+        response[header] = path
+    return response
+
+
+def serve_media(request, path):
+    """Отдаёт файл из MEDIA_ROOT с поддержкой Range и кэширования"""
+    if request.method not in ('GET', 'HEAD'):
+        return HttpResponseNotAllowed(('GET', 'HEAD'))
+    try:
+        # path() не выпускает за пределы MEDIA_ROOT
+        full_path = FileSystemStorage(location=settings.MEDIA_ROOT).path(path)
+        stat = os.stat(full_path)
+    except (SuspiciousFileOperation, OSError):
+        raise Http404
+    if not os.path.isfile(full_path):
+        raise Http404
+
+    etag = f'"{stat.st_size:x}-{stat.st_mtime_ns:x}"'
+    response = get_conditional_response(
+        request, etag=etag, last_modified=int(stat.st_mtime)
+    )
+    if response is None:
+        content_type, encoding = mimetypes.guess_type(full_path)
+        content_type = content_type or 'application/octet-stream'
+        response = offload(full_path, content_type)
+    if response is None:
+        file = open(full_path, 'rb')
+        byte_range = None
+        if 'HTTP_RANGE' in request.META and if_range_matches(
+                request, etag, stat.st_mtime):
+            byte_range = parse_range(request.META['HTTP_RANGE'], stat.st_size)
+        if byte_range == ():
+            file.close()
+            response = HttpResponse(status=416)
+            response['Content-Range'] = f'bytes */{stat.st_size}'
+        elif byte_range:
+            start, end = byte_range
+            response = FileResponse(
+                FileRange(file, start, end - start + 1),
+                content_type=content_type, status=206,
+            )
+            response['Content-Range'] = f'bytes {start}-{end}/{stat.st_size}'
+            response['Content-Length'] = end - start + 1
+        else:
+            # Без диапазона WSGI-сервер может отдать файл через sendfile
+            response = FileResponse(file, content_type=content_type)
+        response.block_size = BLOCK_SIZE
+    response['Accept-Ranges'] = 'bytes'
+    response['ETag'] = etag
+    response['Last-Modified'] = http_date(stat.st_mtime)
+    response['Cache-Control'] = getattr(
+        settings, 'MEDIA_CACHE_CONTROL', 'public, max-age=86400'
+    )
+    return response
@@ -0,0 +1,282 @@
+"""Промежуточные слои проекта"""
+
+import gzip
+import json
+import logging
+import mimetypes
+import os
+import re
+import time
+from pathlib import Path
+
+from django.conf import settings
+from django.contrib.auth.middleware import AuthenticationMiddleware
+from django.contrib.auth.models import AnonymousUser
+from django.core.exceptions import MiddlewareNotUsed
+from django.http import FileResponse, HttpResponseNotModified
+from django.urls import Resolver404, resolve
+from django.utils.cache import patch_cache_control, patch_vary_headers
+from django.utils.http import http_date, parse_etags
+from django.utils.text import compress_sequence
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+logger = logging.getLogger(__name__)
+
+# Хешированные имена не меняются, пока не изменится содержимое
+IMMUTABLE_CACHE_CONTROL = 'public, max-age=31536000, immutable'
+DEFAULT_CACHE_CONTROL = 'public, max-age=60'
+# Сжатые копии в порядке предпочтения
+ENCODINGS = (('br', '.br'), ('gzip', '.gz'))
+# Элемент Accept-Encoding: gzip, br;q=0.8, *;q=0
+coding_re = re.compile(r'([\w*-]+)\s*(?:;\s*q\s*=\s*([0-9.]+))?')
+
+
+def accepts_encoding(request, encoding):
+    """Принимает ли клиент кодировку, с учётом q-значений"""
+    codings = {}
+    for item in request.META.get('HTTP_ACCEPT_ENCODING', '').split(','):
+        match = coding_re.fullmatch(item.strip())
+        if match is None:
+            continue
+        try:
+            quality = float(match[2]) if match[2] else 1
+        except ValueError:
+            quality = 0
+        codings[match[1].lower()] = quality
+    return codings.get(encoding, codings.get('*', 0)) > 0
+
+
+class StaticFilesMiddleware:
+    """Отдаёт собранную collectstatic статику без обращения к views.
+
+    Список файлов строится один раз при запуске. Если клиент принимает
+    сжатие и рядом с файлом лежит .br или .gz копия, отдаётся она.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        static_root = settings.STATIC_ROOT
+        # При DEBUG статику отдаёт runserver прямо из STATICFILES_DIRS
+        if settings.DEBUG or not static_root or not os.path.isdir(
+                static_root):
+            raise MiddlewareNotUsed
+        self.prefix = settings.STATIC_URL
+        self.files = self.scan(Path(static_root))
+
+    def scan(self, static_root):
+        immutable = set()
+        manifest = static_root / 'staticfiles.json'
+        if manifest.exists():
+            immutable.update(
+                json.loads(manifest.read_text())['paths'].values()
+            )
+        files = {}
+        for path in static_root.rglob('*'):
+            if not path.is_file() or path.suffix in ('.gz', '.br'):
+                continue
+            name = path.relative_to(static_root).as_posix()
+            files[name] = {
+                'path': path,
+                'immutable': name in immutable,
+                'encodings': [
+                    (encoding, Path(f'{path}{suffix}'))
+                    for encoding, suffix in ENCODINGS
+                    if Path(f'{path}{suffix}').exists()
+                ],
+            }
+        return files
+
+    def __call__(self, request):
+        if (
+            request.method in ('GET', 'HEAD')
+            and request.path_info.startswith(self.prefix)
+        ):
+            info = self.files.get(request.path_info[len(self.prefix):])
+            if info is not None:
+                return self.serve(request, info)
+        return self.get_response(request)
+
+    def serve(self, request, info):
+        stat = info['path'].stat()
+        path, encoding = info['path'], None
+        for name, compressed in info['encodings']:
+            if accepts_encoding(request, name):
+                path, encoding = compressed, name
+                break
+        # У каждой сжатой копии свой ETag: байты у них разные
+        etag = f'"{stat.st_size:x}-{int(stat.st_mtime):x}'
+        etag += f'-{encoding}"' if encoding else '"'
+        if_none_match = parse_etags(request.META.get('HTTP_IF_NONE_MATCH', ''))
+        if etag in if_none_match or '*' in if_none_match:
+            response = HttpResponseNotModified()
+        else:
+            content_type, _ = mimetypes.guess_type(info['path'].name)
+            response = FileResponse(
+                open(path, 'rb'),
+                content_type=content_type or 'application/octet-stream',
+            )
+            response['Content-Length'] = path.stat().st_size
+            if encoding:
+                response['Content-Encoding'] = encoding
+            if request.method == 'HEAD':
+                response.streaming_content = []
+        response['ETag'] = etag
+        response['Last-Modified'] = http_date(stat.st_mtime)
+        response['Cache-Control'] = (
+            IMMUTABLE_CACHE_CONTROL if info['immutable']
+            else DEFAULT_CACHE_CONTROL
+        )
+        if info['encodings']:
+            response['Vary'] = 'Accept-Encoding'
+        return response
+
+
+# Сжимаем только текстовые ответы, картинки и архивы уже сжаты
+COMPRESSIBLE_TYPES = ('text/html', 'application/json')
+
+
+def compress_brotli_sequence(sequence):
+    compressor = brotli.Compressor(mode=brotli.MODE_TEXT)
+    for item in sequence:
+        data = compressor.process(item) + compressor.flush()
+        if data:
+            yield data
+    yield compressor.finish()
+
+
+class CompressionMiddleware:
+    """Сжимает HTML и JSON ответы gzip или brotli.
+
+    В отличие от django.middleware.gzip.GZipMiddleware выбирает brotli,
+    если он установлен и его принимает клиент, не трогает файлы из
+    MEDIA_URL и ответы меньше COMPRESSION_MIN_SIZE, а время сжатия
+    и степень сжатия отдаёт в заголовке Server-Timing.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.min_size = getattr(settings, 'COMPRESSION_MIN_SIZE', 1024)
+        self.gzip_level = getattr(settings, 'COMPRESSION_GZIP_LEVEL', 6)
+        self.brotli_quality = getattr(
+            settings, 'COMPRESSION_BROTLI_QUALITY', 5
+        )
+
+    def choose_encoding(self, request):
+        if brotli is not None and accepts_encoding(request, 'br'):
+            return 'br'
+        if accepts_encoding(request, 'gzip'):
+            return 'gzip'
+        return None
+
+    def should_compress(self, request, response):
+        if response.has_header('Content-Encoding'):
+            return False
+        if settings.MEDIA_URL and request.path_info.startswith(
+                settings.MEDIA_URL):
+            return False
+        content_type = response.get('Content-Type', '').split(';')[0]
+        if content_type not in COMPRESSIBLE_TYPES:
+            return False
+        return response.streaming or len(response.content) >= self.min_size
+
+    def compress(self, content, encoding):
+        if encoding == 'br':
+            return brotli.compress(
+                content, mode=brotli.MODE_TEXT, quality=self.brotli_quality
+            )
+        return gzip.compress(
+            content, compresslevel=self.gzip_level, mtime=0
+        )
+
+    def __call__(self, request):
+        response = self.get_response(request)
+        if not self.should_compress(request, response):
+            return response
+        patch_vary_headers(response, ('Accept-Encoding',))
+        encoding = self.choose_encoding(request)
+        if encoding is None:
+            return response
+
+        if response.streaming:
+            # Размер заранее неизвестен, метрики не считаем
+            if encoding == 'br':
+                response.streaming_content = compress_brotli_sequence(
+                    response.streaming_content
+                )
+            else:
+                response.streaming_content = compress_sequence(
+                    response.streaming_content
+                )
+            if response.has_header('Content-Length'):
+                del response['Content-Length']
+        else:
+            started = time.thread_time()
+            compressed = self.compress(response.content, encoding)
+            cpu_ms = (time.thread_time() - started) * 1000
+            if len(compressed) >= len(response.content):
+                return response
+            ratio = len(compressed) / len(response.content)
+            response['Server-Timing'] = (
+                f'compress;dur={cpu_ms:.2f};desc="{encoding} {ratio:.2f}"'
+            )
+            logger.debug(
+                '%s: %s %d -> %d bytes, %.2f ms', request.path, encoding,
+                len(response.content), len(compressed), cpu_ms,
+            )
+            response.content = compressed
+            response['Content-Length'] = str(len(compressed))
+
+        # Сжатый ответ побайтно отличается от исходного
+        etag = response.get('ETag')
+        if etag and etag.startswith('"'):
+            response['ETag'] = 'W/' + etag
+        response['Content-Encoding'] = encoding
+        return response
+
+
+class FastPathAuthenticationMiddleware(AuthenticationMiddleware):
+    """AuthenticationMiddleware с быстрым путём для анонимов.
+
+    GET-запрос без cookie сессии к публичной странице из
+    ANONYMOUS_FAST_PATH_URLS заведомо анонимный: пользователь
+    подставляется сразу, сессия не читается, поэтому в ответ не
+    попадает Vary: Cookie. Если задан ANONYMOUS_CACHE_MAX_AGE, ответ
+    разрешается кэшировать прокси; прокси должен пропускать мимо кэша
+    запросы с cookie сессии.
+    """
+
+    def is_fast_path(self, request):
+        if (
+            request.method not in ('GET', 'HEAD')
+            or settings.SESSION_COOKIE_NAME in request.COOKIES
+        ):
+            return False
+        try:
+            match = resolve(request.path_info)
+        except Resolver404:
+            return False
+        return match.view_name in getattr(
+            settings, 'ANONYMOUS_FAST_PATH_URLS', ()
+        )
+
+    def process_request(self, request):
+        if self.is_fast_path(request):
+            request.user = AnonymousUser()
+            request.anonymous_fast_path = True
+        else:
+            super().process_request(request)
+
+    def process_response(self, request, response):
+        max_age = getattr(settings, 'ANONYMOUS_CACHE_MAX_AGE', 0)
+        if (
+            max_age
+            and getattr(request, 'anonymous_fast_path', False)
+            and response.status_code == 200
+            and not response.has_header('Cache-Control')
+        ):
+            patch_cache_control(response, public=True, max_age=max_age)
+        return response
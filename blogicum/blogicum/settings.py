@@ -12,6 +12,8 @@ https://docs.djangoproject.com/en/3.2/ref/settings/
 
 from pathlib import Path
 
+from django.core.exceptions import ImproperlyConfigured
+
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
 
@@ -50,10 +52,12 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    'blogicum.middleware.CompressionMiddleware',
+    'blogicum.middleware.StaticFilesMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
-    'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'blogicum.middleware.FastPathAuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
     'debug_toolbar.middleware.DebugToolbarMiddleware',
@@ -92,6 +96,41 @@ DATABASES = {
     }
 }
 
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    }
+}
+
+# Где хранить сессии:
+# 'db' – в основной базе;
+# 'cached_db' – в кэше default с записью в основную базу, чтение на каждом
+#   запросе идёт из кэша. Только с общим для процессов кэшем, иначе выход
+#   из аккаунта в одном процессе не виден остальным;
+# 'sqlite' – в отдельном файле sessions.sqlite3.
+# Просроченные сессии удаляет команда cleanup_sessions.
+SESSION_STORE = 'db'
+
+if SESSION_STORE == 'sqlite':
+    DATABASES['sessions'] = {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': BASE_DIR / 'sessions.sqlite3',
+    }
+    DATABASE_ROUTERS = ['blogicum.db_routers.SessionRouter']
+    SESSION_ENGINE = 'django.contrib.sessions.backends.db'
+elif SESSION_STORE == 'cached_db':
+    if CACHES['default']['BACKEND'] in (
+        'django.core.cache.backends.locmem.LocMemCache',
+        'django.core.cache.backends.dummy.DummyCache',
+    ):
+        raise ImproperlyConfigured(
+            "SESSION_STORE = 'cached_db' требует общего для процессов кэша"
+        )
+    SESSION_ENGINE = 'django.contrib.sessions.backends.cached_db'
+    SESSION_CACHE_ALIAS = 'default'
+else:
+    SESSION_ENGINE = 'django.contrib.sessions.backends.db'
+
 
 # Password validation
 # https://docs.djangoproject.com/en/3.2/ref/settings/#auth-password-validators
@@ -135,6 +174,14 @@ STATICFILES_DIRS = [
     BASE_DIR / 'static_dev',
 ]
 
+STATIC_ROOT = BASE_DIR / 'static'
+
+# collectstatic добавляет хеш к именам и создаёт сжатые копии,
+# в продакшене их отдаёт blogicum.middleware.StaticFilesMiddleware
+STATICFILES_STORAGE = (
+    'blogicum.static_storage.CompressedManifestStaticFilesStorage'
+)
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/3.2/ref/settings/#default-auto-field
 
@@ -152,8 +199,79 @@ LOGIN_URL = 'login'
 
 MEDIA_ROOT = BASE_DIR / 'media'
 
+MEDIA_URL = '/media/'
+
+# Заголовок, которым отдача медиафайлов передаётся веб-серверу:
+# 'X-Sendfile' (Apache, lighttpd) или 'X-Accel-Redirect' (nginx).
+# None – файлы отдаёт Django
+MEDIA_SENDFILE_HEADER = None
+# internal location nginx, в котором лежит MEDIA_ROOT
+MEDIA_SENDFILE_URL = '/protected-media/'
+
+# Слишком большие картинки отбрасываются ещё во время загрузки
+FILE_UPLOAD_HANDLERS = [
+    'blog.upload_handlers.ImageLimitUploadHandler',
+    'django.core.files.uploadhandler.MemoryFileUploadHandler',
+    'django.core.files.uploadhandler.TemporaryFileUploadHandler',
+]
+POST_IMAGE_MAX_SIZE = 5 * 1024 * 1024
+POST_IMAGE_MAX_SIDE = 10000
+POST_IMAGE_MAX_PIXELS = 40_000_000
+
+# Публичные страницы, которые без cookie сессии отдаются
+# без чтения сессии и без Vary: Cookie
+ANONYMOUS_FAST_PATH_URLS = (
+    'blog:index',
+    'blog:post_detail',
+    'blog:comments',
+    'blog:category_posts',
+    'blog:profile',
+    'blog:api_posts',
+    'blog:api_post_detail',
+    'blog:api_comments',
+    'blog:api_category_posts',
+    'blog:api_profile',
+)
+# Сколько секунд прокси может кэшировать такие страницы, 0 – не может
+ANONYMOUS_CACHE_MAX_AGE = 0
+
+# Сколько постов и комментариев можно отправить за период
+# (s, m, h, d) с одного аккаунта и с одного IP, окно скользящее
+BLOG_RATE_LIMITS = {
+    'post': {'user': '30/h', 'ip': '100/h'},
+    'comment': {'user': '20/m', 'ip': '100/m'},
+}
+# Как часто переносить в базу счётчики отклонённых запросов, секунд
+BLOG_RATE_LIMIT_FLUSH_INTERVAL = 60
+
 EMAIL_BACKEND = 'django.core.mail.backends.filebased.EmailBackend'
 
 EMAIL_FILE_PATH = BASE_DIR / 'sent_emails'
 
 PAGINATE_BY = 10
+
+COMMENTS_PAGINATE_BY = 20
+
+# Время жизни страниц в кэше для анонимных посетителей, 0 – кэш выключен.
+# Для прогрева кэша командой warm_cache нужен общий для процессов бэкенд
+# (memcached, redis, файловый).
+PAGE_CACHE_TIMEOUT = 0
+# Сколько секунд после истечения отдавать устаревшую страницу,
+# пока её пересчитывает другой процесс
+PAGE_CACHE_STALE = 60
+# Сколько секунд ждать чужого пересчёта, если страницы в кэше нет
+PAGE_CACHE_WAIT = 2
+# Время жизни карточек постов в кэше лент (в том числе для авторизованных),
+# 0 – кэш выключен. Версия карточки зависит от поколений поста, категории
+# и локации.
+POST_CARD_CACHE_TIMEOUT = 0
+
+# Время жизни категорий и локаций в кэше процесса, 0 – кэш выключен.
+# Записи сверяются с поколениями групп сброса в кэше страниц, поэтому
+# при нескольких процессах кэш страниц должен быть общим.
+LOOKUP_CACHE_TIMEOUT = 0
+# Сколько записей хранит кэш справочников
+LOOKUP_CACHE_SIZE = 512
+
+# Ответы меньше этого размера не сжимаются
+COMPRESSION_MIN_SIZE = 1024
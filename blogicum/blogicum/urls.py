@@ -1,10 +1,12 @@
 """blogicum URL Configuration"""
+import re
+
 from django.conf import settings
-from django.conf.urls.static import static
 from django.contrib import admin
-from django.urls import include, path
+from django.urls import include, path, re_path
 
 from pages.views import AuthCreateView
+from .media_views import serve_media
 
 handler404 = 'pages.views.page_not_found'
 handler500 = 'pages.views.server_error'
@@ -27,5 +29,11 @@ if settings.DEBUG:
     # Добавить к списку urlpatterns список адресов из приложения debug_toolbar:
     urlpatterns += (path('__debug__/', include(debug_toolbar.urls)),)
 
-# Подключаем функцию static() к urlpatterns:
-urlpatterns += static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
+# Загруженные файлы, если их не отдаёт веб-сервер
+urlpatterns += (
+    re_path(
+        rf'^{re.escape(settings.MEDIA_URL.lstrip("/"))}(?P<path>.+)$',
+        serve_media,
+        name='media',
+    ),
+)
@@ -0,0 +1,19 @@
+'use strict';
+{
+    const $ = django.jQuery;
+
+    // При выборе значения в autocomplete-фильтре перезагружаем changelist
+    // с новым параметром в строке запроса.
+    $(function() {
+        $('.admin-autocomplete-filter select').on('change', function() {
+            const params = new URLSearchParams(window.location.search);
+            if (this.value) {
+                params.set(this.name, this.value);
+            } else {
+                params.delete(this.name);
+            }
+            params.delete('p');
+            window.location.search = params.toString();
+        });
+    });
+}
@@ -0,0 +1,48 @@
+'use strict';
+{
+    // Новые комментарии приходят через server-sent events
+    // и добавляются в конец ветки без перезагрузки страницы.
+    const container = document.getElementById('comments');
+    const counter = document.getElementById('comment-count');
+
+    const renderComment = (comment) => {
+        const item = document.createElement('div');
+        item.className = 'media mb-4';
+        const body = document.createElement('div');
+        body.className = 'media-body';
+        const title = document.createElement('h5');
+        title.className = 'mt-0';
+        const link = document.createElement('a');
+        link.href = container.dataset.profileUrl.replace(
+            'username', encodeURIComponent(comment.author));
+        link.name = `comment_${comment.id}`;
+        link.textContent = `@${comment.author}`;
+        title.append(link);
+        const date = document.createElement('small');
+        date.className = 'text-muted';
+        date.textContent = new Date(comment.created_at).toLocaleString();
+        const text = document.createElement('p');
+        text.textContent = comment.text;
+        body.append(title, date, text);
+        item.append(body);
+        return item;
+    };
+
+    if (container && window.EventSource) {
+        const source = new EventSource(container.dataset.streamUrl);
+        source.addEventListener('comment', (event) => {
+            const comment = JSON.parse(event.data);
+            if (document.getElementsByName(`comment_${comment.id}`).length) {
+                return;
+            }
+            if (counter) {
+                counter.textContent = Number(counter.textContent) + 1;
+            }
+            // Если загружены не все страницы, новый комментарий
+            // появится при подгрузке последней из них
+            if (!container.querySelector('.js-load-comments')) {
+                container.append(renderComment(comment));
+            }
+        });
+    }
+}
@@ -0,0 +1,21 @@
+'use strict';
+{
+    // Подгрузка следующих страниц комментариев без перезагрузки страницы.
+    // Ответ сервера – HTML-фрагмент с комментариями и новой кнопкой.
+    const container = document.getElementById('comments');
+    if (container) {
+        container.addEventListener('click', async (event) => {
+            const button = event.target.closest('.js-load-comments');
+            if (!button) {
+                return;
+            }
+            event.preventDefault();
+            const response = await fetch(button.href);
+            if (!response.ok) {
+                return;
+            }
+            button.insertAdjacentHTML('afterend', await response.text());
+            button.remove();
+        });
+    }
+}
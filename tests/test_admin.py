@@ -0,0 +1,81 @@
+import pytest
+from django.db import connection
+from mixer.backend.django import Mixer
+
+from blog.admin import POST_INLINE_LIMIT
+from blog.models import Post
+from blog.paginators import EstimatedCountPaginator, estimate_row_count
+
+
+@pytest.fixture
+def posts(mixer: Mixer, user):
+    return mixer.cycle(3).blend("blog.Post", author=user)
+
+
+def set_post_stats(stat):
+    with connection.cursor() as cursor:
+        cursor.execute("ANALYZE")
+        cursor.execute("DELETE FROM sqlite_stat1 WHERE tbl = 'blog_post'")
+        if stat:
+            cursor.execute(
+                "INSERT INTO sqlite_stat1 (tbl, idx, stat) "
+                "VALUES ('blog_post', NULL, %s)", [stat])
+
+
+@pytest.mark.django_db
+def test_estimate_from_sqlite_stat1(posts):
+    set_post_stats("50000 1")
+    assert estimate_row_count(Post) == 50000
+    assert EstimatedCountPaginator(Post.objects.all(), 10).count == 50000
+    # Отфильтрованный запрос считается честно
+    assert EstimatedCountPaginator(
+        Post.objects.filter(pk=posts[0].pk), 10).count == 1
+
+
+@pytest.mark.django_db
+def test_exact_count_without_stats(posts):
+    set_post_stats(None)
+    assert estimate_row_count(Post) is None
+    assert EstimatedCountPaginator(Post.objects.all(), 10).count == 3
+
+    # Для маленьких таблиц оценке не доверяем
+    set_post_stats("500 1")
+    assert EstimatedCountPaginator(Post.objects.all(), 10).count == 3
+
+
+@pytest.mark.django_db
+def test_changelist_uses_estimated_count(admin_client, posts):
+    set_post_stats("50000 1")
+    response = admin_client.get("/admin/blog/post/")
+    assert response.status_code == 200
+    changelist = response.context["cl"]
+    assert changelist.result_count == 50000
+    assert changelist.paginator.num_pages == 500
+    assert len(changelist.result_list) == 3
+
+
+@pytest.mark.django_db
+def test_autocomplete_filter_narrows_changelist(
+        admin_client, mixer: Mixer, posts, another_user):
+    other = mixer.blend("blog.Post", author=another_user)
+    response = admin_client.get(
+        f"/admin/blog/post/?author__id__exact={another_user.id}")
+    assert list(response.context["cl"].result_list) == [other]
+    assert 'id="id_filter_author"' in response.content.decode()
+
+
+@pytest.mark.django_db
+def test_post_inline_is_read_only_and_capped(
+        admin_client, mixer: Mixer, user, published_category):
+    mixer.cycle(POST_INLINE_LIMIT + 5).blend(
+        "blog.Post", author=user, category=published_category)
+    response = admin_client.get(
+        f"/admin/blog/category/{published_category.id}/change/")
+    inline = response.context["inline_admin_formsets"][0]
+    assert len(inline.formset.forms) == POST_INLINE_LIMIT
+    assert inline.formset.total_count == POST_INLINE_LIMIT + 5
+    assert not inline.has_add_permission
+    assert not inline.has_change_permission
+    assert not inline.has_delete_permission
+    assert f"category__id__exact={published_category.id}" in (
+        response.content.decode())
@@ -0,0 +1,31 @@
+import pytest
+
+
+def vary(response):
+    return response.get("Vary", "")
+
+
+@pytest.mark.django_db
+def test_anonymous_feed_has_no_vary_cookie(client, settings):
+    response = client.get("/")
+    assert response.wsgi_request.anonymous_fast_path
+    assert "Cookie" not in vary(response)
+    assert not response.has_header("Cache-Control")
+
+    settings.ANONYMOUS_CACHE_MAX_AGE = 60
+    response = client.get("/")
+    assert "public" in response["Cache-Control"]
+    assert "max-age=60" in response["Cache-Control"]
+
+
+@pytest.mark.django_db
+def test_session_cookie_and_private_pages_take_normal_path(
+        client, user_client, settings):
+    settings.ANONYMOUS_CACHE_MAX_AGE = 60
+    response = user_client.get("/")
+    assert "Cookie" in vary(response)
+    assert not hasattr(response.wsgi_request, "anonymous_fast_path")
+    assert "public" not in response.get("Cache-Control", "")
+
+    response = client.get("/auth/login/")
+    assert not hasattr(response.wsgi_request, "anonymous_fast_path")
@@ -0,0 +1,90 @@
+from http import HTTPStatus
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from mixer.backend.django import Mixer
+
+from conftest import N_PER_PAGE
+
+
+@pytest.fixture
+def feed_posts(mixer: Mixer, user, published_category, published_location):
+    return mixer.cycle(N_PER_PAGE + 3).blend(
+        "blog.Post", author=user, category=published_category,
+        location=published_location, is_published=True,
+    )
+
+
+@pytest.mark.django_db
+def test_api_feed_pagination(client, feed_posts):
+    response = client.get("/api/posts/")
+    assert response.status_code == HTTPStatus.OK
+    data = response.json()
+    expected = sorted(
+        feed_posts, key=lambda post: (post.pub_date, post.id), reverse=True)
+    assert [item["id"] for item in data["results"]] == [
+        post.id for post in expected[:N_PER_PAGE]]
+    assert data["next"]
+
+    data = client.get(data["next"]).json()
+    assert [item["id"] for item in data["results"]] == [
+        post.id for post in expected[N_PER_PAGE:]]
+    assert data["next"] is None
+
+
+@pytest.mark.django_db
+def test_api_field_selection(client, feed_posts):
+    with CaptureQueriesContext(connection) as queries:
+        data = client.get("/api/posts/?fields=id,title&limit=2").json()
+    assert len(queries) == 1
+    assert "COUNT" not in queries[0]["sql"]
+    assert len(data["results"]) == 2
+    assert set(data["results"][0]) == {"id", "title"}
+    assert client.get(
+        "/api/posts/?fields=password").status_code == HTTPStatus.BAD_REQUEST
+
+
+@pytest.mark.django_db
+def test_api_visibility(
+        client, user_client, feed_posts, user, published_category):
+    hidden = feed_posts[0]
+    hidden.is_published = False
+    hidden.save()
+    feed_ids = [
+        item["id"] for item in client.get("/api/posts/?limit=100").json()[
+            "results"]]
+    assert hidden.id not in feed_ids
+    assert client.get(
+        f"/api/posts/{hidden.id}/").status_code == HTTPStatus.NOT_FOUND
+    assert client.get(
+        f"/api/posts/{hidden.id}/comments/"
+    ).status_code == HTTPStatus.NOT_FOUND
+    assert user_client.get(
+        f"/api/posts/{hidden.id}/").status_code == HTTPStatus.OK
+
+    profile_url = f"/api/profile/{user.username}/?limit=100"
+    anonymous_ids = [
+        item["id"] for item in client.get(profile_url).json()["results"]]
+    author_ids = [
+        item["id"] for item in user_client.get(profile_url).json()["results"]]
+    assert hidden.id not in anonymous_ids
+    assert hidden.id in author_ids
+
+    category_url = f"/api/category/{published_category.slug}/"
+    assert client.get(category_url).status_code == HTTPStatus.OK
+    published_category.is_published = False
+    published_category.save()
+    assert client.get(category_url).status_code == HTTPStatus.NOT_FOUND
+
+
+@pytest.mark.django_db
+def test_api_comments(client, mixer: Mixer, feed_posts, another_user):
+    post = feed_posts[0]
+    comments = mixer.cycle(3).blend(
+        "blog.Comments", post=post, author=another_user)
+    data = client.get(f"/api/posts/{post.id}/comments/").json()
+    assert [item["id"] for item in data["results"]] == [
+        comment.id for comment in comments]
+    assert data["results"][0]["author"] == another_user.username
+    assert client.get(f"/api/posts/{post.id}/").json()["comment_count"] == 3
@@ -0,0 +1,72 @@
+from http import HTTPStatus
+
+import pytest
+from asgiref.sync import async_to_sync
+from django.test import AsyncClient
+from mixer.backend.django import Mixer
+
+from conftest import N_PER_PAGE
+
+
+@pytest.fixture
+def async_posts(mixer: Mixer, user, published_category):
+    return mixer.cycle(N_PER_PAGE + 2).blend(
+        "blog.Post", author=user, category=published_category,
+        is_published=True,
+    )
+
+
+@pytest.mark.django_db(transaction=True)
+def test_async_index_pagination(async_posts):
+    client = AsyncClient()
+    response = async_to_sync(client.get)("/async/")
+    assert response.status_code == HTTPStatus.OK
+    page_obj = response.context["page_obj"]
+    assert len(page_obj.object_list) == N_PER_PAGE
+    assert page_obj.paginator.count == len(async_posts)
+    response = async_to_sync(client.get)("/async/?page=2")
+    assert len(response.context["page_obj"].object_list) == 2
+    response = async_to_sync(client.get)("/async/?page=3")
+    assert response.status_code == HTTPStatus.NOT_FOUND
+
+
+@pytest.mark.django_db(transaction=True)
+def test_async_category_and_profile(
+        client, user_client, async_posts, user, published_category):
+    hidden = async_posts[0]
+    hidden.is_published = False
+    hidden.save()
+
+    response = client.get(f"/async/category/{published_category.slug}/")
+    assert response.status_code == HTTPStatus.OK
+    assert response.context["category"] == published_category
+    assert response.context["page_obj"].paginator.count == (
+        len(async_posts) - 1)
+    assert client.get(
+        "/async/category/no-such-category/"
+    ).status_code == HTTPStatus.NOT_FOUND
+
+    profile_url = f"/async/profile/{user.username}/"
+    response = client.get(profile_url)
+    assert response.context["profile"] == user
+    assert response.context["page_obj"].paginator.count == (
+        len(async_posts) - 1)
+    response = user_client.get(profile_url)
+    assert response.context["page_obj"].paginator.count == len(async_posts)
+
+
+@pytest.mark.django_db(transaction=True)
+def test_async_post_detail(client, user_client, async_posts, mixer: Mixer):
+    post = async_posts[0]
+    mixer.cycle(3).blend("blog.Comments", post=post)
+    response = client.get(f"/async/posts/{post.id}/")
+    assert response.status_code == HTTPStatus.OK
+    assert response.context["post"] == post
+    assert response.context["comment_count"] == 3
+    assert len(response.context["comments"]) == 3
+
+    post.is_published = False
+    post.save()
+    url = f"/async/posts/{post.id}/"
+    assert client.get(url).status_code == HTTPStatus.NOT_FOUND
+    assert user_client.get(url).status_code == HTTPStatus.OK
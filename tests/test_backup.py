@@ -0,0 +1,64 @@
+import sqlite3
+
+import pytest
+
+from blog.backup_utils import (BackupError, create_backup, list_snapshots,
+                               restore_backup, rotate_snapshots)
+
+
+@pytest.fixture
+def sqlite_db(tmp_path):
+    path = tmp_path / "db.sqlite3"
+    connection = sqlite3.connect(path)
+    connection.execute("CREATE TABLE post (id INTEGER PRIMARY KEY, text)")
+    connection.executemany(
+        "INSERT INTO post (text) VALUES (?)",
+        [(f"post {i}" * 50,) for i in range(2000)],
+    )
+    connection.commit()
+    connection.close()
+    return path
+
+
+def count_posts(path):
+    connection = sqlite3.connect(path)
+    try:
+        return connection.execute("SELECT COUNT(*) FROM post").fetchone()[0]
+    finally:
+        connection.close()
+
+
+@pytest.mark.parametrize("compress", [False, True])
+def test_backup_and_restore(sqlite_db, tmp_path, compress):
+    backup_dir = tmp_path / "backups"
+    snapshot, stats = create_backup(
+        sqlite_db, backup_dir, compress=compress, pages=8, pause=0)
+    assert snapshot.exists()
+    assert stats["pages"] > 8
+    assert list_snapshots(backup_dir) == [snapshot]
+
+    connection = sqlite3.connect(sqlite_db)
+    connection.execute("DELETE FROM post")
+    connection.commit()
+    connection.close()
+
+    restore_backup(snapshot, sqlite_db)
+    assert count_posts(sqlite_db) == 2000
+    assert count_posts(f"{sqlite_db}.old") == 0
+
+
+def test_rotate_snapshots(sqlite_db, tmp_path):
+    backup_dir = tmp_path / "backups"
+    snapshots = [
+        create_backup(sqlite_db, backup_dir, pause=0)[0] for _ in range(3)]
+    assert rotate_snapshots(backup_dir, keep=1) == snapshots[:2]
+    assert list_snapshots(backup_dir) == snapshots[2:]
+
+
+def test_restore_rejects_broken_snapshot(sqlite_db, tmp_path):
+    broken = tmp_path / "db-broken.sqlite3"
+    broken.write_bytes(b"not a database" * 100)
+    with pytest.raises(BackupError):
+        restore_backup(broken, sqlite_db)
+    assert count_posts(sqlite_db) == 2000
+    assert not list(tmp_path.glob(".db.sqlite3.*.tmp"))
@@ -0,0 +1,69 @@
+from http import HTTPStatus
+
+import pytest
+from django.conf import settings
+from mixer.backend.django import Mixer
+
+
+@pytest.fixture
+def many_comments(mixer: Mixer, published_post, another_user):
+    return mixer.cycle(settings.COMMENTS_PAGINATE_BY + 5).blend(
+        "blog.Comments", post=published_post, author=another_user
+    )
+
+
+@pytest.mark.django_db
+def test_post_detail_shows_first_comments_page(
+        client, published_post, many_comments):
+    response = client.get(f"/posts/{published_post.id}/")
+    assert response.status_code == HTTPStatus.OK
+    comments = response.context["comments"]
+    assert len(comments) == settings.COMMENTS_PAGINATE_BY, (
+        "Убедитесь, что на странице поста выводится только первая страница"
+        " комментариев."
+    )
+    assert [c.id for c in comments] == [
+        c.id for c in many_comments[:settings.COMMENTS_PAGINATE_BY]]
+    assert response.context["comment_count"] == len(many_comments)
+    assert response.context["comments_next_cursor"]
+
+
+@pytest.mark.django_db
+def test_comments_next_page(client, published_post, many_comments):
+    detail = client.get(f"/posts/{published_post.id}/")
+    cursor = detail.context["comments_next_cursor"]
+    url = f"/posts/{published_post.id}/comments/?after={cursor}"
+
+    response = client.get(url)
+    assert response.status_code == HTTPStatus.OK
+    rest = many_comments[settings.COMMENTS_PAGINATE_BY:]
+    assert [c.id for c in response.context["comments"]] == [
+        c.id for c in rest]
+    assert response.context["comments_next_cursor"] is None
+    content = response.content.decode("utf-8")
+    assert "<html" not in content, (
+        "Убедитесь, что следующие страницы комментариев отдаются"
+        " HTML-фрагментом без базового шаблона."
+    )
+
+    response = client.get(url + "&format=json")
+    data = response.json()
+    assert [item["id"] for item in data["results"]] == [c.id for c in rest]
+    assert data["next"] is None
+
+
+@pytest.mark.django_db
+def test_comments_bad_cursor(client, published_post):
+    response = client.get(
+        f"/posts/{published_post.id}/comments/?after=garbage")
+    assert response.status_code == HTTPStatus.BAD_REQUEST
+
+
+@pytest.mark.django_db
+def test_comments_of_hidden_post(
+        client, user_client, published_post, many_comments):
+    published_post.is_published = False
+    published_post.save()
+    url = f"/posts/{published_post.id}/comments/"
+    assert client.get(url).status_code == HTTPStatus.NOT_FOUND
+    assert user_client.get(url).status_code == HTTPStatus.OK
@@ -0,0 +1,75 @@
+import json
+from http import HTTPStatus
+
+import pytest
+from mixer.backend.django import Mixer
+
+from blog.events import InProcessBackend, get_backend, post_channel
+
+
+def read_event(response):
+    chunk = next(response.streaming_content).decode()
+    lines = dict(
+        line.split(": ", 1) for line in chunk.strip().splitlines())
+    return lines.get("event"), json.loads(lines["data"])
+
+
+def test_in_process_backend():
+    backend = InProcessBackend()
+    first = backend.subscribe("post:1")
+    other = backend.subscribe("post:2")
+    backend.publish("post:1", {"id": 1})
+    assert first.get(timeout=0) == {"id": 1}
+    assert other.get(timeout=0) is None
+    first.close()
+    other.close()
+    assert not backend.subscriptions
+
+
+@pytest.mark.django_db(transaction=True)
+def test_comment_stream_receives_new_comments(
+        client, another_user_client, another_user, published_post):
+    response = client.get(f"/posts/{published_post.id}/comments/stream/")
+    assert response.status_code == HTTPStatus.OK
+    assert response["Content-Type"] == "text/event-stream"
+    assert next(response.streaming_content).startswith(b"retry:")
+
+    another_user_client.post(
+        f"/posts/{published_post.id}/comment", {"text": "Новый комментарий"})
+    event, data = read_event(response)
+    assert event == "comment"
+    assert data["text"] == "Новый комментарий"
+    assert data["author"] == another_user.username
+    response.close()
+
+
+@pytest.mark.django_db
+def test_comment_stream_replays_missed_comments(
+        client, mixer: Mixer, published_post):
+    comments = mixer.cycle(3).blend("blog.Comments", post=published_post)
+    response = client.get(
+        f"/posts/{published_post.id}/comments/stream/",
+        HTTP_LAST_EVENT_ID=str(comments[0].id),
+    )
+    next(response.streaming_content)
+    assert [read_event(response)[1]["id"] for _ in range(2)] == [
+        comment.id for comment in comments[1:]]
+    response.close()
+
+
+@pytest.mark.django_db
+def test_comment_stream_unsubscribes_if_never_read(client, published_post):
+    channel = post_channel(published_post.id)
+    response = client.get(f"/posts/{published_post.id}/comments/stream/")
+    assert get_backend().subscriptions.get(channel)
+    # Клиент отключился до первого чтения потока
+    response.close()
+    assert channel not in get_backend().subscriptions
+
+
+@pytest.mark.django_db
+def test_comment_stream_of_hidden_post(client, published_post):
+    published_post.is_published = False
+    published_post.save()
+    response = client.get(f"/posts/{published_post.id}/comments/stream/")
+    assert response.status_code == HTTPStatus.NOT_FOUND
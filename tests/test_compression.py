@@ -0,0 +1,68 @@
+import gzip
+
+import pytest
+from django.http import HttpResponse, StreamingHttpResponse
+from django.test import RequestFactory
+
+from blogicum import middleware as blog_middleware
+from blogicum.middleware import CompressionMiddleware
+
+PAGE = "<p>Лента постов</p>" * 200
+
+
+def make_middleware(response):
+    return CompressionMiddleware(lambda request: response)
+
+
+@pytest.fixture
+def without_brotli(monkeypatch):
+    monkeypatch.setattr(blog_middleware, "brotli", None)
+
+
+def test_compresses_html_above_threshold(without_brotli):
+    response = make_middleware(HttpResponse(PAGE))(
+        RequestFactory().get("/", HTTP_ACCEPT_ENCODING="gzip, br"))
+    assert response["Content-Encoding"] == "gzip"
+    assert response["Vary"] == "Accept-Encoding"
+    assert gzip.decompress(response.content).decode() == PAGE
+    assert response["Server-Timing"].startswith("compress;dur=")
+
+
+@pytest.mark.parametrize("response, path", [
+    (HttpResponse("<p>Коротко</p>"), "/"),
+    (HttpResponse(PAGE, content_type="image/svg+xml"), "/"),
+    (HttpResponse(PAGE), "/media/post_images/page.html"),
+])
+def test_skips_small_binary_and_media(without_brotli, response, path):
+    response = make_middleware(response)(
+        RequestFactory().get(path, HTTP_ACCEPT_ENCODING="gzip"))
+    assert not response.has_header("Content-Encoding")
+
+
+def test_compresses_streaming_response(without_brotli):
+    response = make_middleware(
+        StreamingHttpResponse(iter([PAGE.encode()] * 3)))(
+        RequestFactory().get("/", HTTP_ACCEPT_ENCODING="gzip"))
+    assert response["Content-Encoding"] == "gzip"
+    content = b"".join(response.streaming_content)
+    assert gzip.decompress(content).decode() == PAGE * 3
+
+
+def test_no_compression_without_accept_encoding():
+    response = make_middleware(HttpResponse(PAGE))(
+        RequestFactory().get("/"))
+    assert not response.has_header("Content-Encoding")
+    assert response.content.decode() == PAGE
+
+
+@pytest.mark.parametrize("accept", ["gzip;q=0", "br, *;q=0", "identity"])
+def test_respects_rejected_encodings(without_brotli, accept):
+    response = make_middleware(HttpResponse(PAGE))(
+        RequestFactory().get("/", HTTP_ACCEPT_ENCODING=accept))
+    assert not response.has_header("Content-Encoding")
+
+
+def test_wildcard_accepts_gzip(without_brotli):
+    response = make_middleware(HttpResponse(PAGE))(
+        RequestFactory().get("/", HTTP_ACCEPT_ENCODING="*"))
+    assert response["Content-Encoding"] == "gzip"
@@ -0,0 +1,57 @@
+import gzip
+import json
+from http import HTTPStatus
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from mixer.backend.django import Mixer
+
+
+@pytest.fixture
+def export_posts(mixer: Mixer, user, another_user, published_category):
+    return [
+        mixer.blend("blog.Post", author=user, category=published_category),
+        mixer.blend("blog.Post", author=another_user),
+    ]
+
+
+def read_ndjson(content: bytes):
+    return [json.loads(line) for line in content.decode().splitlines()]
+
+
+@pytest.mark.django_db
+def test_export_view_only_for_staff(user_client, export_posts):
+    response = user_client.get("/export/posts/")
+    assert response.status_code == HTTPStatus.FORBIDDEN
+
+
+@pytest.mark.django_db
+def test_export_view_streams_ndjson(admin_client, export_posts, user):
+    response = admin_client.get("/export/posts/")
+    assert response.status_code == HTTPStatus.OK
+    assert response.streaming
+    rows = read_ndjson(b"".join(response.streaming_content))
+    assert [row["id"] for row in rows] == [post.id for post in export_posts]
+
+    response = admin_client.get(
+        f"/export/posts/?author={user.username}&gzip=1")
+    rows = read_ndjson(gzip.decompress(b"".join(response.streaming_content)))
+    assert [row["id"] for row in rows] == [export_posts[0].id]
+    assert rows[0]["author"] == user.username
+
+    response = admin_client.get("/export/posts/?since=yesterday")
+    assert response.status_code == HTTPStatus.BAD_REQUEST
+
+
+@pytest.mark.django_db
+def test_export_command(export_posts, published_category, mixer: Mixer):
+    comment = mixer.blend("blog.Comments", post=export_posts[0])
+    out = StringIO()
+    call_command(
+        "export_ndjson", "comments",
+        f"--category={published_category.slug}", stdout=out,
+    )
+    rows = read_ndjson(out.getvalue().encode())
+    assert [row["id"] for row in rows] == [comment.id]
+    assert rows[0]["post"] == export_posts[0].id
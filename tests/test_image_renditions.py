@@ -0,0 +1,110 @@
+import os
+import time
+from io import BytesIO
+
+import pytest
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.utils import timezone
+from mixer.backend.django import Mixer
+from PIL import Image
+
+from blog.models import Post
+
+
+def make_jpeg(width, height):
+    buffer = BytesIO()
+    Image.new("RGB", (width, height), "red").save(buffer, "JPEG")
+    return SimpleUploadedFile("photo.jpg", buffer.getvalue(), "image/jpeg")
+
+
+@pytest.fixture
+def image_posts(mixer: Mixer, user, published_category, media_root):
+    posts = mixer.cycle(4).blend(
+        "blog.Post", author=user, category=published_category,
+        is_published=True, pub_date=timezone.now(), image=None,
+    )
+    for post in posts:
+        post.image = make_jpeg(1600, 800)
+        post.save()
+    call_command("backfill_image_metadata", renditions=True, workers=1)
+    for post in posts:
+        post.refresh_from_db()
+    return posts
+
+
+@pytest.mark.django_db
+def test_renditions_created_on_save(image_posts, media_root):
+    post = image_posts[0]
+    post.refresh_from_db()
+    renditions = post.image_meta["renditions"]
+    assert [(r["width"], r["height"]) for r in renditions] == [
+        (320, 160), (640, 320), (1280, 640), (1600, 800)]
+    for rendition in post.image_meta["renditions"]:
+        with Image.open(media_root / rendition["name"]) as image:
+            assert image.size == (rendition["width"], rendition["height"])
+
+
+@pytest.mark.django_db
+def test_renditions_not_built_on_save(mixer: Mixer, user, media_root):
+    post = mixer.blend("blog.Post", author=user, image=None)
+    post.image = make_jpeg(1600, 800)
+    post.save()
+    post.refresh_from_db()
+    assert post.image_meta["width"] == 1600
+    assert "renditions" not in post.image_meta
+    assert not list(media_root.rglob("*.w320.jpg"))
+
+    call_command("backfill_image_metadata", renditions=True)
+    post.refresh_from_db()
+    assert len(post.image_meta["renditions"]) == 4
+
+
+@pytest.mark.django_db
+def test_srcset_in_feed(client, image_posts):
+    content = client.get("/").content.decode()
+    post = image_posts[0]
+    assert f'/media/{post.image_meta["renditions"][0]["name"]} 320w' in content
+    assert 'width="1600" height="800"' in content
+    assert content.count('loading="eager"') == 2
+    assert content.count('loading="lazy"') == 2
+
+
+@pytest.mark.django_db
+def test_gc_media_keeps_renditions_of_used_images(image_posts, media_root):
+    post = image_posts[0]
+    old = time.time() - 2 * 3600
+    for path in media_root.rglob("*.jpg"):
+        os.utime(path, (old, old))
+    call_command("gc_media")
+    for rendition in post.image_meta["renditions"]:
+        assert (media_root / rendition["name"]).exists()
+
+
+@pytest.mark.django_db
+def test_image_metadata_saved(image_posts):
+    post = Post.objects.get(pk=image_posts[0].pk)
+    meta = post.image_meta
+    assert (meta["width"], meta["height"]) == (1600, 800)
+    assert meta["format"] == "JPEG"
+    assert meta["bytes"] == post.image.size
+
+
+@pytest.mark.django_db
+def test_backfill_image_metadata(image_posts):
+    Post.objects.update(image_meta={})
+    call_command("backfill_image_metadata", batch_size=3, workers=2)
+    for post in Post.objects.all():
+        meta = post.image_meta
+        assert (meta["width"], meta["height"]) == (1600, 800)
+        assert "renditions" not in meta
+
+    call_command("backfill_image_metadata", renditions=True, all=True)
+    assert len(Post.objects.first().image_meta["renditions"]) == 4
+
+
+@pytest.mark.django_db
+def test_api_image_dimensions(client, image_posts):
+    data = client.get("/api/posts/?fields=id,image_width,image_height").json()
+    assert data["results"][0]["image_width"] == 1600
+    assert data["results"][0]["image_height"] == 800
@@ -0,0 +1,101 @@
+import pytest
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from mixer.backend.django import Mixer
+
+from blog.models import ImageBlob, Post
+
+
+def make_post(mixer, user, name, content):
+    post = mixer.blend("blog.Post", author=user, image=None)
+    post.image = SimpleUploadedFile(name, content, content_type="image/gif")
+    post.save()
+    return post
+
+
+@pytest.mark.django_db
+def test_same_upload_stored_once(mixer: Mixer, user, media_root):
+    first = make_post(mixer, user, "cat.GIF", b"GIF89a same image")
+    second = make_post(mixer, user, "copy.gif", b"GIF89a same image")
+    other = make_post(mixer, user, "dog.gif", b"GIF89a other image")
+
+    assert first.image.name == second.image.name
+    assert first.image.name != other.image.name
+    name = first.image.name
+    digest = name.rsplit("/", 1)[1][:-len(".gif")]
+    assert name == f"posts_images/{digest[:2]}/{digest[2:4]}/{digest}.gif"
+    assert len(list(media_root.rglob("*.gif"))) == 2
+    assert ImageBlob.objects.get(name=name).ref_count == 2
+
+    second.delete()
+    assert ImageBlob.objects.get(name=name).ref_count == 1
+    first.image = other.image.name
+    first.save()
+    assert ImageBlob.objects.get(name=name).ref_count == 0
+    assert ImageBlob.objects.get(name=other.image.name).ref_count == 2
+
+
+@pytest.mark.django_db
+def test_gc_deletes_unreferenced_blobs(mixer: Mixer, user, media_root):
+    kept = make_post(mixer, user, "kept.gif", b"GIF89a kept")
+    removed = make_post(mixer, user, "removed.gif", b"GIF89a removed")
+    removed_name = removed.image.name
+    removed.delete()
+
+    call_command("gc_image_blobs", grace_minutes=0, dry_run=True)
+    assert (media_root / removed_name).exists()
+    call_command("gc_image_blobs")
+    assert (media_root / removed_name).exists()
+
+    call_command("gc_image_blobs", grace_minutes=0)
+    assert not (media_root / removed_name).exists()
+    assert (media_root / kept.image.name).exists()
+    assert not ImageBlob.objects.filter(name=removed_name).exists()
+
+
+@pytest.mark.django_db
+def test_gc_recount_after_bulk_create(mixer: Mixer, user, media_root):
+    post = make_post(mixer, user, "bulk.gif", b"GIF89a bulk")
+    ImageBlob.objects.all().delete()
+    Post.objects.bulk_create([
+        Post(title="copy", text="copy", pub_date=post.pub_date,
+             author=user, image=post.image.name)
+    ])
+    call_command("gc_image_blobs", recount=True, grace_minutes=0)
+    assert ImageBlob.objects.get(name=post.image.name).ref_count == 2
+    assert (media_root / post.image.name).exists()
+
+
+@pytest.mark.django_db
+def test_gc_keeps_blob_referenced_during_run(
+        mixer: Mixer, user, media_root, monkeypatch):
+    post = make_post(mixer, user, "race.gif", b"GIF89a race")
+    name = post.image.name
+    post.delete()
+    filter_posts = Post.objects.filter
+
+    def reference_meanwhile(*args, **kwargs):
+        # Новый пост ссылается на файл между выборкой и удалением
+        ImageBlob.objects.filter(name=name).update(ref_count=1)
+        return filter_posts(*args, **kwargs)
+
+    monkeypatch.setattr(Post.objects, "filter", reference_meanwhile)
+    call_command("gc_image_blobs", grace_minutes=0)
+    assert (media_root / name).exists()
+    assert ImageBlob.objects.get(name=name).ref_count == 1
+
+
+@pytest.mark.django_db
+def test_first_reference_survives_concurrent_create(monkeypatch):
+    from blog.signals import change_image_refs
+
+    get_or_create = ImageBlob.objects.get_or_create
+
+    def created_meanwhile(**kwargs):
+        # Другой запрос успел создать запись первым
+        ImageBlob.objects.create(name="posts_images/a.gif", ref_count=1)
+        return get_or_create(**kwargs)
+
+    monkeypatch.setattr(ImageBlob.objects, "get_or_create", created_meanwhile)
+    change_image_refs("posts_images/a.gif", 1)
+    assert ImageBlob.objects.get().ref_count == 2
@@ -0,0 +1,36 @@
+import io
+import json
+from pathlib import Path
+
+import pytest
+from django.core.management import call_command
+
+from blog.import_utils import iter_fixture_objects
+from blog.models import Category, Location, Post
+
+DB_JSON = Path(__file__).resolve().parent.parent / "db.json"
+
+
+def test_iter_fixture_objects_matches_json_load():
+    content = DB_JSON.read_text(encoding="utf-8")
+    streamed = list(iter_fixture_objects(io.StringIO(content), chunk_size=97))
+    assert streamed == json.loads(content)
+    assert list(iter_fixture_objects(io.StringIO("[]"))) == []
+
+
+@pytest.mark.django_db(transaction=True)
+def test_import_fixtures_command():
+    out = io.StringIO()
+    call_command("import_fixtures", str(DB_JSON), "--batch-size=7",
+                 stdout=out)
+    data = json.loads(DB_JSON.read_text(encoding="utf-8"))
+    for model in (Category, Location, Post):
+        label = model._meta.label_lower
+        expected = {obj["pk"] for obj in data if obj["model"] == label}
+        assert set(model.objects.values_list("pk", flat=True)) == expected
+    # Новые объекты получают pk после загруженных
+    post = Post.objects.order_by("pk").last()
+    post.pk = None
+    post.save()
+    assert post.pk > max(
+        obj["pk"] for obj in data if obj["model"] == "blog.post")
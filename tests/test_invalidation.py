@@ -0,0 +1,145 @@
+import pytest
+from django.core.cache import cache
+from django.db import transaction
+from django.utils import timezone
+from mixer.backend.django import Mixer
+
+from blog import invalidation
+from blog.invalidation import get_generations, invalidate, invalidate_posts
+from blog.models import Post
+
+
+@pytest.fixture
+def cached_pages(settings):
+    settings.PAGE_CACHE_TIMEOUT = 60
+    cache.clear()
+    yield
+    cache.clear()
+
+
+@pytest.fixture
+def purges(monkeypatch):
+    calls = []
+    purge = invalidation.purge
+
+    def counting_purge(groups):
+        calls.append(set(groups))
+        purge(groups)
+
+    monkeypatch.setattr(invalidation, "purge", counting_purge)
+    return calls
+
+
+@pytest.fixture
+def post(mixer: Mixer, user, published_category):
+    return mixer.blend(
+        "blog.Post", author=user, category=published_category,
+        is_published=True, pub_date=timezone.now(),
+    )
+
+
+@pytest.mark.django_db(transaction=True)
+def test_comments_invalidate_post_pages_in_one_batch(
+        cached_pages, purges, client, mixer: Mixer, post, user):
+    urls = (
+        "/", f"/posts/{post.id}/", f"/category/{post.category.slug}/",
+        f"/profile/{user.username}/",
+    )
+    for url in urls:
+        client.get(url)
+        assert client.get(url)["X-Page-Cache"] == "hit"
+    other_category = f"/category/{mixer.blend('blog.Category').slug}/"
+    client.get(other_category)
+
+    purges.clear()
+    with transaction.atomic():
+        mixer.blend("blog.Comments", post=post, author=user)
+        mixer.blend("blog.Comments", post=post, author=user)
+    assert purges == [{
+        "index", f"post:{post.id}", f"category:{post.category.slug}",
+        f"profile:{user.username}",
+    }]
+    for url in urls:
+        assert client.get(url)["X-Page-Cache"] == "miss"
+    assert client.get(other_category)["X-Page-Cache"] == "hit"
+
+
+@pytest.mark.django_db(transaction=True)
+def test_rolled_back_changes_do_not_invalidate(cached_pages, purges):
+    with pytest.raises(ValueError):
+        with transaction.atomic():
+            invalidate("index")
+            raise ValueError
+    with transaction.atomic():
+        invalidate("post:1")
+    assert purges == [{"post:1"}]
+
+
+@pytest.mark.django_db(transaction=True)
+def test_bulk_update_hook(cached_pages, post):
+    before = get_generations(["index", f"post:{post.id}"])
+    Post.objects.filter(pk=post.pk).update(title="Новый заголовок")
+    invalidate_posts(Post.objects.filter(pk=post.pk))
+    after = get_generations(["index", f"post:{post.id}"])
+    assert before[0] != after[0] and before[1] != after[1]
+
+
+@pytest.mark.django_db(transaction=True)
+def test_category_toggle_bumps_one_counter(cached_pages, purges, post):
+    category = post.category
+    purges.clear()
+    category.is_published = False
+    category.save()
+    assert purges == [{
+        f"cat:{category.id}", f"category:{category.slug}", "categories",
+        "feeds", "details",
+    }]
+
+
+@pytest.mark.django_db(transaction=True)
+def test_post_card_versions(settings, cached_pages, user_client,
+                            mixer: Mixer, post, user):
+    settings.POST_CARD_CACHE_TIMEOUT = 60
+    other = mixer.blend(
+        "blog.Post", author=user, category=mixer.blend("blog.Category"),
+        is_published=True, pub_date=timezone.now(),
+    )
+    response = user_client.get("/")
+    versions = {
+        card.id: card.card_version for card in response.context["page_obj"]
+    }
+    assert post.title in response.content.decode()
+
+    post.category.is_published = False
+    post.category.save()
+    response = user_client.get(f"/profile/{user.username}/")
+    cards = {
+        card.id: card.card_version for card in response.context["page_obj"]
+    }
+    assert cards[post.id] != versions[post.id]
+    assert cards[other.id] == versions[other.id]
+    assert "Выбранная категория снята с публикации" in (
+        response.content.decode())
+
+
+@pytest.mark.django_db(transaction=True)
+def test_registration_keeps_cache(cached_pages, purges, mixer: Mixer):
+    purges.clear()
+    mixer.blend("auth.User")
+    assert purges == []
+
+
+@pytest.mark.django_db(transaction=True)
+def test_username_change_purges_author_pages(
+        settings, cached_pages, purges, user_client, post, user):
+    settings.POST_CARD_CACHE_TIMEOUT = 60
+    old_username = user.username
+    user_client.get("/")
+    purges.clear()
+    user.username = "renamed"
+    user.save()
+    assert purges == [{
+        f"profile:{old_username}", "profile:renamed", f"author:{user.id}",
+        "feeds", "details",
+    }]
+    assert "@renamed" in user_client.get("/").content.decode()
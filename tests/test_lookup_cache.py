@@ -0,0 +1,94 @@
+from http import HTTPStatus
+
+import pytest
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from mixer.backend.django import Mixer
+
+from blog import lookups
+from blog.invalidation import generation_key, get_page_cache
+from blog.models import Category
+from blog.query_utils import get_model_queryset, hydrate_relations
+
+
+@pytest.fixture
+def lookup_cache(settings):
+    settings.LOOKUP_CACHE_TIMEOUT = 60
+    lookups.clear()
+    cache.clear()
+    yield
+    lookups.clear()
+    cache.clear()
+
+
+@pytest.fixture
+def posts(mixer: Mixer, user, published_category):
+    location = mixer.blend("blog.Location", is_published=True)
+    return mixer.cycle(3).blend(
+        "blog.Post", author=user, category=published_category,
+        location=location, is_published=True, pub_date=timezone.now(),
+    )
+
+
+@pytest.mark.django_db
+def test_feed_hydrates_relations_without_joins(lookup_cache, posts):
+    queryset = get_model_queryset(add_annotation=True, cached_relations=True)
+    assert "blog_category" not in str(queryset.query)
+    hydrate_relations(list(queryset))
+
+    with CaptureQueriesContext(connection) as queries:
+        items = list(get_model_queryset(cached_relations=True))
+        hydrate_relations(items)
+        assert {post.category.slug for post in items} == {
+            posts[0].category.slug}
+        assert {post.location.name for post in items} == {
+            posts[0].location.name}
+    assert len(queries) == 1
+
+
+@pytest.mark.django_db
+def test_entries_follow_shared_generations(lookup_cache, posts):
+    category = posts[0].category
+    assert lookups.get_categories([category.id])[category.id].title == (
+        category.title)
+    # Другой процесс поменял категорию: у нас сработал только общий кэш
+    Category.objects.filter(pk=category.pk).update(title="Новое название")
+    get_page_cache().set(generation_key(f"cat:{category.id}"), "new", None)
+    fresh = lookups.get_categories([category.id])[category.id]
+    assert fresh.title == "Новое название"
+
+    # Наружу отдаются копии, изменения не попадают в кэш
+    fresh.title = "Изменено в запросе"
+    assert lookups.get_categories([category.id])[category.id].title == (
+        "Новое название")
+
+
+@pytest.mark.django_db
+def test_category_changes_drop_entries(lookup_cache, client, posts):
+    category = posts[0].category
+    url = f"/category/{category.slug}/"
+    assert client.get(url).status_code == HTTPStatus.OK
+    assert lookups.get_category_by_slug(category.slug) is not None
+
+    category.is_published = False
+    category.save()
+    assert client.get(url).status_code == HTTPStatus.NOT_FOUND
+    assert not get_model_queryset(cached_relations=True).exists()
+
+
+def test_lru_eviction_and_ttl(settings, monkeypatch):
+    settings.LOOKUP_CACHE_TIMEOUT = 10
+    settings.LOOKUP_CACHE_SIZE = 2
+    cache = lookups.LRUCache()
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+    assert (cache.get("a"), cache.get("b"), cache.get("c")) == (1, None, 3)
+
+    now = lookups.time.monotonic()
+    monkeypatch.setattr(lookups.time, "monotonic", lambda: now + 11)
+    assert cache.get("a") is None
+    assert len(cache) == 1
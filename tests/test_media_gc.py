@@ -0,0 +1,48 @@
+import os
+import time
+
+import pytest
+from django.core.management import call_command
+from mixer.backend.django import Mixer
+
+
+@pytest.fixture
+def images_dir(media_root):
+    images = media_root / "posts_images"
+    old = time.time() - 2 * 3600
+    for name in ("kept.jpg", "orphan.jpg", "ab/cd/orphan.gif", "fresh.jpg"):
+        path = images / name
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(b"image")
+        if name != "fresh.jpg":
+            os.utime(path, (old, old))
+    return images
+
+
+@pytest.mark.django_db
+def test_gc_media_removes_old_orphans(mixer: Mixer, user, images_dir):
+    mixer.blend("blog.Post", author=user, image="posts_images/kept.jpg")
+
+    call_command("gc_media", dry_run=True)
+    assert (images_dir / "orphan.jpg").exists()
+
+    call_command("gc_media", batch_size=2)
+    assert (images_dir / "kept.jpg").exists()
+    assert (images_dir / "fresh.jpg").exists()
+    assert not (images_dir / "orphan.jpg").exists()
+    assert not (images_dir / "ab").exists()
+
+
+def test_reused_upload_is_not_old(media_root):
+    from django.core.files.base import ContentFile
+
+    from blog.storage import ContentAddressedStorage
+
+    storage = ContentAddressedStorage()
+    name = storage.save("posts_images/cat.jpg", ContentFile(b"image"))
+    old = time.time() - 2 * 3600
+    os.utime(storage.path(name), (old, old))
+
+    assert storage.save(
+        "posts_images/copy.jpg", ContentFile(b"image")) == name
+    assert os.stat(storage.path(name)).st_mtime > old + 3600
@@ -0,0 +1,75 @@
+from http import HTTPStatus
+
+import pytest
+
+CONTENT = bytes(range(256)) * 40
+
+
+@pytest.fixture
+def media_file(media_root):
+    (media_root / "post_images").mkdir()
+    (media_root / "post_images" / "photo.jpg").write_bytes(CONTENT)
+    return "/media/post_images/photo.jpg"
+
+
+def read(response):
+    content = b"".join(response.streaming_content)
+    response.close()
+    return content
+
+
+@pytest.mark.django_db
+def test_full_file_and_conditional_requests(client, media_file):
+    response = client.get(media_file)
+    assert response.status_code == HTTPStatus.OK
+    assert response["Content-Type"] == "image/jpeg"
+    assert response["Accept-Ranges"] == "bytes"
+    assert read(response) == CONTENT
+
+    response = client.get(media_file, HTTP_IF_NONE_MATCH=response["ETag"])
+    assert response.status_code == HTTPStatus.NOT_MODIFIED
+    response = client.get(
+        media_file, HTTP_IF_MODIFIED_SINCE=response["Last-Modified"])
+    assert response.status_code == HTTPStatus.NOT_MODIFIED
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("header, start, end", [
+    ("bytes=0-99", 0, 99),
+    ("bytes=10000-", 10000, len(CONTENT) - 1),
+    ("bytes=-240", len(CONTENT) - 240, len(CONTENT) - 1),
+])
+def test_range_requests(client, media_file, header, start, end):
+    response = client.get(media_file, HTTP_RANGE=header)
+    assert response.status_code == HTTPStatus.PARTIAL_CONTENT
+    assert response["Content-Range"] == f"bytes {start}-{end}/{len(CONTENT)}"
+    assert int(response["Content-Length"]) == end - start + 1
+    assert read(response) == CONTENT[start:end + 1]
+
+
+@pytest.mark.django_db
+def test_unsatisfiable_range_and_missing_files(client, media_file):
+    response = client.get(media_file, HTTP_RANGE="bytes=99999-")
+    assert response.status_code == HTTPStatus.REQUESTED_RANGE_NOT_SATISFIABLE
+    assert client.get("/media/post_images/missing.jpg").status_code == (
+        HTTPStatus.NOT_FOUND)
+    assert client.get("/media/../settings.py").status_code == (
+        HTTPStatus.NOT_FOUND)
+
+
+@pytest.mark.django_db
+def test_accel_redirect_offload(client, media_file, settings):
+    settings.MEDIA_SENDFILE_HEADER = "X-Accel-Redirect"
+    response = client.get(media_file)
+    assert response["X-Accel-Redirect"] == (
+        "/protected-media/post_images/photo.jpg")
+    assert response.content == b""
+
+
+@pytest.mark.django_db
+def test_accel_redirect_quotes_non_ascii_names(client, media_file, settings):
+    settings.MEDIA_SENDFILE_HEADER = "X-Accel-Redirect"
+    (settings.MEDIA_ROOT / "post_images" / "фото.jpg").write_bytes(CONTENT)
+    response = client.get("/media/post_images/фото.jpg")
+    assert response["X-Accel-Redirect"] == (
+        "/protected-media/post_images/%D1%84%D0%BE%D1%82%D0%BE.jpg")
@@ -0,0 +1,114 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from django.core.cache import cache
+from django.core.management import CommandError, call_command
+from django.test import override_settings
+from django.utils import timezone
+from mixer.backend.django import Mixer
+
+from blog.page_cache import get_cache_stats, single_flight
+
+
+@pytest.fixture
+def cached_pages(settings):
+    settings.PAGE_CACHE_TIMEOUT = 60
+    cache.clear()
+    yield
+    cache.clear()
+
+
+@pytest.fixture
+def hot_posts(mixer: Mixer, user, published_category):
+    return mixer.cycle(3).blend(
+        "blog.Post", author=user, category=published_category,
+        is_published=True, pub_date=timezone.now(),
+    )
+
+
+@pytest.mark.django_db
+def test_page_cache_anonymous_only(
+        cached_pages, client, user_client, hot_posts):
+    response = client.get("/")
+    assert response["X-Page-Cache"] == "miss"
+    response = client.get("/")
+    assert response["X-Page-Cache"] == "hit"
+    assert hot_posts[0].title.encode() in response.content
+    response = user_client.get("/")
+    assert "X-Page-Cache" not in response
+
+
+@pytest.mark.django_db
+def test_warm_cache(cached_pages, client, hot_posts, published_category):
+    call_command("warm_cache", workers=1)
+    for url in (
+        "/",
+        f"/category/{published_category.slug}/",
+        f"/profile/{hot_posts[0].author.username}/",
+        f"/posts/{hot_posts[0].id}/",
+    ):
+        assert client.get(url)["X-Page-Cache"] == "hit", url
+
+
+@pytest.mark.django_db
+@override_settings(PAGE_CACHE_TIMEOUT=0)
+def test_warm_cache_disabled():
+    with pytest.raises(CommandError):
+        call_command("warm_cache")
+
+
+def test_single_flight_coalesces_concurrent_misses(settings):
+    settings.PAGE_CACHE_POLL = 0.01
+    cache.clear()
+    calls = []
+
+    def compute():
+        calls.append(1)
+        time.sleep(0.2)
+        return "page"
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        results = list(executor.map(
+            lambda _: single_flight(cache, "feed", compute, 60), range(8)
+        ))
+    assert len(calls) == 1
+    assert {value for value, _ in results} == {"page"}
+    assert sorted(status for _, status in results) == (
+        ["coalesced"] * 7 + ["miss"]
+    )
+    assert get_cache_stats()["coalesced"] == 7
+    cache.clear()
+
+
+def test_single_flight_serves_stale_while_revalidating():
+    cache.clear()
+    single_flight(cache, "feed", lambda: "old", 60)
+    entry = cache.get("feed")
+    entry["expires"] = time.time() - 1
+    cache.set("feed", entry)
+    cache.add("feed:lock", 1)
+    assert single_flight(cache, "feed", lambda: "new", 60) == (
+        "old", "stale")
+    cache.delete("feed:lock")
+    assert single_flight(cache, "feed", lambda: "new", 60) == (
+        "new", "miss")
+    cache.clear()
+
+
+def test_single_flight_waiters_skip_uncacheable(settings):
+    settings.PAGE_CACHE_POLL = 0.01
+    cache.clear()
+
+    def not_found():
+        time.sleep(0.1)
+
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        started = time.monotonic()
+        results = list(executor.map(
+            lambda _: single_flight(cache, "missing", not_found, 60),
+            range(4),
+        ))
+    assert time.monotonic() - started < 1
+    assert {status for _, status in results} == {"miss"}
+    cache.clear()
@@ -0,0 +1,41 @@
+from datetime import timedelta
+
+import pytest
+from django.contrib.auth.models import User
+from django.contrib.sessions.models import Session
+from django.core.management import call_command
+from django.utils import timezone
+
+from blogicum.db_routers import SessionRouter
+
+
+@pytest.mark.django_db
+def test_cleanup_sessions_deletes_expired_in_batches():
+    now = timezone.now()
+    Session.objects.bulk_create(
+        Session(
+            session_key=f"expired{i}", session_data="",
+            expire_date=now - timedelta(days=1),
+        )
+        for i in range(7)
+    )
+    Session.objects.bulk_create(
+        Session(
+            session_key=f"active{i}", session_data="",
+            expire_date=now + timedelta(days=1),
+        )
+        for i in range(2)
+    )
+    call_command("cleanup_sessions", batch_size=3, pause=0)
+    assert set(Session.objects.values_list("session_key", flat=True)) == {
+        "active0", "active1"}
+
+
+def test_session_router():
+    router = SessionRouter()
+    assert router.db_for_write(Session) == "sessions"
+    assert router.db_for_read(User) is None
+    assert router.allow_migrate("sessions", "sessions")
+    assert not router.allow_migrate("default", "sessions")
+    assert not router.allow_migrate("sessions", "blog")
+    assert router.allow_migrate("default", "blog") is None
@@ -0,0 +1,73 @@
+import gzip
+import json
+
+import pytest
+from django.core.management import call_command
+from django.http import HttpResponse
+from django.test import RequestFactory
+
+from blogicum.middleware import StaticFilesMiddleware
+from blogicum.static_storage import CompressedManifestStaticFilesStorage
+
+
+@pytest.fixture
+def collected(settings, tmp_path):
+    settings.STATIC_ROOT = tmp_path
+    call_command("collectstatic", interactive=False, verbosity=0)
+    manifest = json.loads((tmp_path / "staticfiles.json").read_text())
+    return manifest["paths"]
+
+
+@pytest.fixture
+def middleware(collected):
+    return StaticFilesMiddleware(lambda request: HttpResponse("view"))
+
+
+def test_collectstatic_hashes_and_compresses(collected, tmp_path):
+    hashed = collected["css/bootstrap.min.css"]
+    assert hashed != "css/bootstrap.min.css"
+    original = (tmp_path / hashed).read_bytes()
+    compressed = (tmp_path / f"{hashed}.gz").read_bytes()
+    assert gzip.decompress(compressed) == original
+
+
+def test_serves_precompressed_hashed_file(middleware, collected):
+    url = "/static/" + collected["css/bootstrap.min.css"]
+    response = middleware(
+        RequestFactory().get(url, HTTP_ACCEPT_ENCODING="gzip, deflate"))
+    assert response["Content-Encoding"] == "gzip"
+    assert response["Content-Type"] == "text/css"
+    assert "immutable" in response["Cache-Control"]
+    assert response["Vary"] == "Accept-Encoding"
+    etag = response["ETag"]
+    response.file_to_stream.close()
+
+    response = middleware(RequestFactory().get(url))
+    assert not response.has_header("Content-Encoding")
+    assert response["ETag"] != etag
+    response.file_to_stream.close()
+
+    response = middleware(RequestFactory().get(
+        url, HTTP_ACCEPT_ENCODING="gzip", HTTP_IF_NONE_MATCH=etag))
+    assert response.status_code == 304
+    response = middleware(
+        RequestFactory().get(url, HTTP_ACCEPT_ENCODING="gzip;q=0"))
+    assert not response.has_header("Content-Encoding")
+    response.file_to_stream.close()
+
+
+def test_unhashed_and_unknown_paths(middleware):
+    response = middleware(
+        RequestFactory().get("/static/css/bootstrap.min.css"))
+    assert "immutable" not in response["Cache-Control"]
+    response.file_to_stream.close()
+    response = middleware(RequestFactory().get("/static/missing.css"))
+    assert response.content == b"view"
+
+
+def test_missing_manifest_entry(collected, tmp_path):
+    storage = CompressedManifestStaticFilesStorage(location=tmp_path)
+    with pytest.raises(ValueError):
+        storage.stored_name("css/missing.css")
+    empty = CompressedManifestStaticFilesStorage(location=tmp_path / "empty")
+    assert empty.stored_name("css/missing.css") == "css/missing.css"
@@ -0,0 +1,101 @@
+from http import HTTPStatus
+from types import SimpleNamespace
+
+import pytest
+from django.core.cache import cache
+
+from mixer.backend.django import Mixer
+
+from blog.models import Comments, ThrottledRequest
+
+
+@pytest.fixture
+def strict_limits(settings, monkeypatch):
+    # Все запросы теста попадают в одно окно
+    monkeypatch.setattr(
+        "blog.throttling.time", SimpleNamespace(time=lambda: 1_000_030.0))
+    settings.BLOG_RATE_LIMITS = {
+        "comment": {"user": "2/m", "ip": "3/m"},
+    }
+    cache.clear()
+    yield
+    cache.clear()
+
+
+@pytest.fixture
+def post(mixer: Mixer, user, published_category):
+    return mixer.blend(
+        "blog.Post", author=user, category=published_category,
+        is_published=True, pub_date="2020-01-01T00:00Z",
+    )
+
+
+def add_comment(client, post):
+    return client.post(
+        f"/posts/{post.id}/comment", data={"text": "Комментарий"})
+
+
+@pytest.mark.django_db
+def test_comment_rate_limited_per_user(strict_limits, user_client, post):
+    assert add_comment(user_client, post).status_code == HTTPStatus.FOUND
+    assert add_comment(user_client, post).status_code == HTTPStatus.FOUND
+    response = add_comment(user_client, post)
+    assert response.status_code == HTTPStatus.TOO_MANY_REQUESTS
+    assert response["Retry-After"] == "50"
+    assert Comments.objects.count() == 2
+    counter = ThrottledRequest.objects.get()
+    assert (counter.scope, counter.count) == ("comment", 1)
+
+    # Следующие отказы копятся в кэше, а не пишутся в базу
+    for _ in range(3):
+        assert add_comment(user_client, post).status_code == (
+            HTTPStatus.TOO_MANY_REQUESTS)
+    counter.refresh_from_db()
+    assert counter.count == 1
+    cache.delete(f"blog:throttle:rejected:comment:user:{post.author.username}:flushed")
+    add_comment(user_client, post)
+    counter.refresh_from_db()
+    assert counter.count == 5
+
+
+@pytest.mark.django_db
+def test_comment_rate_limited_per_ip(
+        strict_limits, user_client, another_user_client, post):
+    for client in (user_client, user_client, another_user_client):
+        assert add_comment(client, post).status_code == HTTPStatus.FOUND
+    response = add_comment(another_user_client, post)
+    assert response.status_code == HTTPStatus.TOO_MANY_REQUESTS
+    # Просмотр страниц не ограничивается
+    assert another_user_client.get(f"/posts/{post.id}/").status_code == (
+        HTTPStatus.OK)
+
+
+@pytest.mark.django_db
+def test_no_double_limit_across_window_boundary(
+        strict_limits, monkeypatch, user_client, post):
+    assert add_comment(user_client, post).status_code == HTTPStatus.FOUND
+    assert add_comment(user_client, post).status_code == HTTPStatus.FOUND
+    # Новое окно началось 5 секунд назад, прошлое ещё перекрыто на 55/60
+    monkeypatch.setattr(
+        "blog.throttling.time", SimpleNamespace(time=lambda: 1_000_085.0))
+    response = add_comment(user_client, post)
+    assert response.status_code == HTTPStatus.TOO_MANY_REQUESTS
+    assert response["Retry-After"] == "25"
+    # Вес прошлого окна упал, запрос проходит
+    monkeypatch.setattr(
+        "blog.throttling.time", SimpleNamespace(time=lambda: 1_000_111.0))
+    assert add_comment(user_client, post).status_code == HTTPStatus.FOUND
+
+
+@pytest.mark.django_db
+def test_concurrent_requests_do_not_exceed_limit(strict_limits, rf, user):
+    from concurrent.futures import ThreadPoolExecutor
+
+    from blog.throttling import take_token
+
+    request = rf.post("/")
+    request.user = user
+    with ThreadPoolExecutor(8) as executor:
+        waits = list(executor.map(
+            lambda _: take_token("comment", request), range(16)))
+    assert waits.count(0) == 2
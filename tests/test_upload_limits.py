@@ -0,0 +1,75 @@
+from io import BytesIO
+
+import pytest
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.utils import timezone
+from PIL import Image
+
+from blog.models import Post
+
+pytestmark = pytest.mark.usefixtures("media_root")
+
+
+def make_png(width, height):
+    buffer = BytesIO()
+    Image.new("RGB", (width, height), "white").save(buffer, "PNG")
+    return SimpleUploadedFile("photo.png", buffer.getvalue(), "image/png")
+
+
+@pytest.fixture
+def post_data(published_category):
+    return {
+        "title": "Заголовок",
+        "text": "Текст",
+        "pub_date": timezone.now().strftime("%Y-%m-%dT%H:%M"),
+        "category": published_category.id,
+        "is_published": True,
+    }
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("limits, error", [
+    ({"POST_IMAGE_MAX_SIZE": 100}, "Размер файла"),
+    ({"POST_IMAGE_MAX_SIDE": 200}, "Стороны изображения"),
+    ({"POST_IMAGE_MAX_PIXELS": 50_000}, "мегапикселей"),
+])
+def test_oversized_upload_rejected(
+        settings, user_client, post_data, limits, error):
+    for name, value in limits.items():
+        setattr(settings, name, value)
+    response = user_client.post(
+        "/posts/create/", {**post_data, "image": make_png(300, 300)})
+    # Файл отброшен ещё при приёме, до валидации формы
+    assert "image" in response.wsgi_request.upload_errors
+    form = response.context["form"]
+    assert error in form.errors["image"][0]
+    assert not Post.objects.exists()
+
+
+@pytest.mark.django_db
+def test_image_within_limits_accepted(user_client, post_data):
+    response = user_client.post(
+        "/posts/create/", {**post_data, "image": make_png(300, 300)})
+    assert response.status_code == 302
+    assert Post.objects.get().image.name.endswith(".png")
+
+
+@pytest.mark.django_db
+def test_oversized_upload_rejected_in_admin(
+        settings, admin_client, user, published_category):
+    settings.POST_IMAGE_MAX_SIDE = 50
+    now = timezone.now()
+    response = admin_client.post("/admin/blog/post/add/", {
+        "title": "Заголовок",
+        "text": "Текст",
+        "pub_date_0": now.strftime("%Y-%m-%d"),
+        "pub_date_1": now.strftime("%H:%M:%S"),
+        "author": user.id,
+        "category": published_category.id,
+        "is_published": True,
+        "image": make_png(200, 100),
+    })
+    assert response.status_code == 200
+    form = response.context["adminform"].form
+    assert "Стороны изображения" in form.errors["image"][0]
+    assert not Post.objects.exists()